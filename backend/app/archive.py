@@ -0,0 +1,125 @@
+from datetime import datetime
+from sqlalchemy import and_, exists, func, literal, or_, select
+from . import db
+from .models import (Note, NoteCounter, NoteText, NoteSignature, NoteLshBucket, Log, AcademicSession, Section,
+                     ArchivedNote, ArchivedLog, note_sections, archived_note_sections)
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def archivable_notes(session_ids=None):
+    """Query for the ids of hot notes that belong only to inactive academic sessions.
+
+    A note belongs to a session through its sections; notes without sections
+    belong to the session whose ``year_name`` matches their academic year. A
+    note linked to any section of an active session is never archived.
+    ``session_ids`` narrows the inactive sessions considered.
+    """
+    inactive = AcademicSession.query.filter(AcademicSession.is_active == False)
+    if session_ids:
+        inactive = inactive.filter(AcademicSession.id.in_(session_ids))
+    inactive = inactive.with_entities(AcademicSession.id, AcademicSession.year_name).all()
+    if not inactive:
+        return None
+
+    def linked_to(session_filter):
+        return exists().where(and_(
+            note_sections.c.note_id == Note.id,
+            note_sections.c.section_id == Section.id,
+            Section.academic_session_id == AcademicSession.id,
+            session_filter
+        ))
+
+    has_sections = exists().where(note_sections.c.note_id == Note.id)
+    return db.session.query(Note.id).filter(
+        ~linked_to(AcademicSession.is_active == True),
+        or_(
+            linked_to(AcademicSession.id.in_([s.id for s in inactive])),
+            and_(~has_sections, Note.academic_year.in_([s.year_name for s in inactive]))
+        )
+    )
+
+
+def archive_note_batch(note_ids):
+    """Moves the given notes and their section links to the archive tables in one transaction.
+
+    View and download counts and the extracted text are folded into the
+    archived row. Signatures and LSH buckets are dropped, since they only
+    serve duplicate detection among hot notes. The stored file keeps its
+    reference, so the blob stays in storage for the archived note.
+    """
+    note_columns = [column.name for column in Note.__table__.columns]
+    notes = Note.__table__
+    texts = NoteText.__table__
+    counts = NoteCounter.__table__
+    source = select(
+        *[notes.c[name] for name in note_columns],
+        func.coalesce(counts.c.views, 0), func.coalesce(counts.c.downloads, 0),
+        texts.c.page_count, texts.c.content,
+        literal(datetime.utcnow(), db.DateTime)
+    ).select_from(
+        notes.outerjoin(counts, counts.c.note_id == notes.c.id).outerjoin(texts, texts.c.note_id == notes.c.id)
+    ).where(notes.c.id.in_(note_ids))
+
+    db.session.execute(ArchivedNote.__table__.insert().from_select(
+        note_columns + ['views', 'downloads', 'text_page_count', 'text_content', 'archived_at'], source))
+    db.session.execute(archived_note_sections.insert().from_select(
+        ['note_id', 'section_id'],
+        select(note_sections.c.note_id, note_sections.c.section_id).where(note_sections.c.note_id.in_(note_ids))))
+
+    NoteSignature.query.filter(NoteSignature.duplicate_of_id.in_(note_ids)).update(
+        {NoteSignature.duplicate_of_id: None, NoteSignature.duplicate_similarity: None}, synchronize_session=False)
+    for model in (NoteLshBucket, NoteSignature, NoteText, NoteCounter):
+        model.query.filter(model.note_id.in_(note_ids)).delete(synchronize_session=False)
+    db.session.execute(note_sections.delete().where(note_sections.c.note_id.in_(note_ids)))
+    Note.query.filter(Note.id.in_(note_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def archive_notes(session_ids=None, batch_size=ARCHIVE_BATCH_SIZE, on_batch=None):
+    """Archives every archivable note in batches of ``batch_size``, each committed on its own.
+
+    Interrupting it loses nothing: committed batches are gone from the hot
+    table and the next run picks up whatever is left.
+    """
+    query = archivable_notes(session_ids)
+    if query is None:
+        return 0
+
+    archived = last_id = 0
+    while True:
+        note_ids = [row.id for row in query.filter(Note.id > last_id).order_by(Note.id).limit(batch_size)]
+        if not note_ids:
+            return archived
+        archive_note_batch(note_ids)
+        archived += len(note_ids)
+        last_id = note_ids[-1]
+        if on_batch:
+            on_batch(archived)
+
+
+def log_cutoff():
+    """Logs written before the active session was activated belong to sessions that are now closed."""
+    return db.session.query(AcademicSession.activated_at).filter(
+        AcademicSession.is_active == True).scalar()
+
+
+def archive_logs(before, batch_size=ARCHIVE_BATCH_SIZE, on_batch=None):
+    """Moves logs older than ``before`` to ``archived_logs``, oldest first, one commit per batch."""
+    logs = Log.__table__
+    log_columns = [column.name for column in logs.columns]
+    archived = 0
+    while True:
+        log_ids = [row.id for row in db.session.query(Log.id).filter(Log.timestamp < before)
+                   .order_by(Log.id).limit(batch_size)]
+        if not log_ids:
+            return archived
+        db.session.execute(ArchivedLog.__table__.insert().from_select(
+            log_columns + ['archived_at'],
+            select(*[logs.c[name] for name in log_columns], literal(datetime.utcnow(), db.DateTime))
+            .where(logs.c.id.in_(log_ids))))
+        Log.query.filter(Log.id.in_(log_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        archived += len(log_ids)
+        if on_batch:
+            on_batch(archived)
@@ -0,0 +1,100 @@
+import bisect
+from .indexing import RebuildableIndex, normalize
+
+
+class PrefixIndex(RebuildableIndex):
+    """Sorted-array prefix index of subjects, note titles and usernames.
+
+    Each term is stored once per word start ("operating systems" is also
+    reachable from "sys") as a ``(key, kind, text)`` tuple in one sorted
+    list, so a lookup is a bisect plus a short scan. Terms are reference
+    counted because many notes share a subject. ``max_terms`` caps memory;
+    once full, new terms are dropped until the next rebuild.
+    """
+
+    def __init__(self, max_terms=200000, max_words=4, max_term_length=100, scan_limit=100):
+        super().__init__()
+        self.max_terms = max_terms
+        self.max_words = max_words
+        self.max_term_length = max_term_length
+        self.scan_limit = scan_limit
+        self._keys = []
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _entries(self, kind, text):
+        normalized = normalize(text)[:self.max_term_length]
+        words = normalized.split(' ')
+        for i in range(min(len(words), self.max_words)):
+            yield (' '.join(words[i:]), kind, text)
+
+    def add(self, kind, text):
+        if not text:
+            return
+        with self._lock:
+            term = (kind, text)
+            if term in self._counts:
+                self._counts[term] += 1
+                return
+            if len(self._counts) >= self.max_terms:
+                return
+            self._counts[term] = 1
+            for entry in self._entries(kind, text):
+                bisect.insort(self._keys, entry)
+
+    def remove(self, kind, text):
+        if not text:
+            return
+        with self._lock:
+            term = (kind, text)
+            count = self._counts.get(term)
+            if count is None:
+                return
+            if count > 1:
+                self._counts[term] = count - 1
+                return
+            del self._counts[term]
+            for entry in self._entries(kind, text):
+                i = bisect.bisect_left(self._keys, entry)
+                if i < len(self._keys) and self._keys[i] == entry:
+                    del self._keys[i]
+
+    def replace(self, kind, old_text, new_text):
+        if old_text != new_text:
+            self.remove(kind, old_text)
+            self.add(kind, new_text)
+
+    def _load(self, terms):
+        """Replaces the index contents with ``(kind, text)`` pairs."""
+        counts = {}
+        for kind, text in terms:
+            if text and ((kind, text) in counts or len(counts) < self.max_terms):
+                counts[(kind, text)] = counts.get((kind, text), 0) + 1
+        keys = sorted(entry for kind, text in counts for entry in self._entries(kind, text))
+
+        with self._lock:
+            self._counts = counts
+            self._keys = keys
+
+    def lookup(self, prefix, limit=10, kinds=None):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            keys = self._keys
+            i = bisect.bisect_left(keys, (prefix,))
+            seen = {}
+            scanned = 0
+            while i < len(keys) and scanned < self.scan_limit and keys[i][0].startswith(prefix):
+                _, kind, text = keys[i]
+                if kinds is None or kind in kinds:
+                    seen[(kind, text)] = self._counts.get((kind, text), 0)
+                i += 1
+                scanned += 1
+
+        # Most widely used terms first, then shortest
+        ranked = sorted(seen.items(), key=lambda item: (-item[1], len(item[0][1]), item[0][1]))
+        return [{'text': text, 'kind': kind, 'count': count} for (kind, text), count in ranked[:limit]]
@@ -0,0 +1,94 @@
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Prefetched files beyond this size spill from memory to a temporary file
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+class _ZipSink:
+    """Write-only file object that hands zipfile's output to the response as it is produced.
+
+    It has no ``tell``, so zipfile treats it as unseekable and writes data
+    descriptors after each member instead of seeking back to the header.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def fetch_to_spool(url, timeout=60):
+    # The whole file is fetched here, in a prefetch thread, so a slow store never stalls the zip stream mid-member
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def stream_zip(entries, prefetch=4, fetch=fetch_to_spool):
+    """Yields a ZIP archive of ``(name, url, date_time)`` entries, in order, as it is built.
+
+    Members are stored without compression (PDFs barely compress) and up to
+    ``prefetch`` files are downloaded ahead of the one being written, each
+    into a small spool, so memory stays bounded however big the bundle is.
+    Files that cannot be fetched are listed in ``MISSING.txt`` at the end.
+    """
+    sink = _ZipSink()
+    missing = []
+    pool = ThreadPoolExecutor(max_workers=max(1, prefetch))
+    try:
+        pending = deque()
+        queued = iter(entries)
+        for entry in queued:
+            pending.append((entry, pool.submit(fetch, entry[1])))
+            if len(pending) >= prefetch:
+                break
+
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            while pending:
+                (name, url, date_time), future = pending.popleft()
+                next_entry = next(queued, None)
+                if next_entry is not None:
+                    pending.append((next_entry, pool.submit(fetch, next_entry[1])))
+
+                try:
+                    source = future.result()
+                except Exception as e:
+                    print(f"Could not fetch {url} for bundle: {e}")
+                    missing.append(name)
+                    continue
+
+                with source, archive.open(zipfile.ZipInfo(name, date_time), 'w', force_zip64=True) as member:
+                    for chunk in iter(lambda: source.read(DOWNLOAD_CHUNK_SIZE), b''):
+                        member.write(chunk)
+                        yield sink.drain()
+                yield sink.drain()
+
+            if missing:
+                archive.writestr('MISSING.txt', "These notes could not be downloaded:\n" + '\n'.join(missing) + '\n')
+        yield sink.drain()
+    finally:
+        # Also runs when the client disconnects mid-download
+        pool.shutdown(wait=False, cancel_futures=True)
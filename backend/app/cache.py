@@ -0,0 +1,40 @@
+import threading
+from cachetools import TTLCache
+
+
+class NamespacedCache:
+    """Thread-safe in-process TTL cache with namespace invalidation.
+
+    Every entry is stored under the current generation of each namespace it
+    depends on, so ``invalidate(namespace)`` only has to bump a counter; the
+    stale entries become unreachable and age out of the LRU on their own.
+
+    The cache is per worker process, so the TTL bounds how long another
+    worker can keep serving an entry that was invalidated elsewhere.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _versioned_key(self, namespaces, key):
+        return tuple((ns, self._generations.get(ns, 0)) for ns in namespaces), key
+
+    def get(self, namespaces, key, default=None):
+        with self._lock:
+            return self._entries.get(self._versioned_key(namespaces, key), default)
+
+    def set(self, namespaces, key, value):
+        with self._lock:
+            self._entries[self._versioned_key(namespaces, key)] = value
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for ns in namespaces:
+                self._generations[ns] = self._generations.get(ns, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
@@ -0,0 +1,157 @@
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import or_
+from . import db
+from .models import Note, Log
+from .extraction import build_derivatives
+from .file_store import store_preview
+from .archive import ARCHIVE_BATCH_SIZE, archivable_notes, archive_notes, archive_logs, log_cutoff
+from .logger import log_activity
+from .user_import import IMPORT_BATCH_SIZE, RosterImporter, read_roster, roster_format
+from . import trending
+
+notes_cli = AppGroup('notes', help='Maintenance commands for notes, their files and the archive.')
+users_cli = AppGroup('users', help='User administration commands.')
+
+
+@notes_cli.command('backfill-derivatives')
+@click.option('--workers', default=4, show_default=True, help='Files downloaded and rendered in parallel.')
+@click.option('--limit', type=int, default=None, help='Process at most this many files.')
+def backfill_derivatives(workers, limit):
+    """Records size and page count and renders previews for notes uploaded before they existed.
+
+    Each distinct file is downloaded and rendered once in a worker process;
+    at most two files per worker are in flight, so memory stays bounded
+    however many notes are missing derivatives.
+    """
+    query = db.session.query(Note.file_url).filter(or_(
+        Note.file_size.is_(None),
+        Note.page_count.is_(None),
+        Note.preview_url.is_(None)
+    )).distinct()
+    if limit:
+        query = query.limit(limit)
+    file_urls = [row.file_url for row in query]
+    click.echo(f"{len(file_urls)} files to process with {workers} workers.")
+
+    queued = iter(file_urls)
+    pending = {}
+    processed = failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        def fill():
+            for file_url in itertools.islice(queued, workers * 2 - len(pending)):
+                pending[pool.submit(build_derivatives, file_url)] = file_url
+
+        fill()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                file_url = pending.pop(future)
+                try:
+                    _store_derivatives(future.result())
+                    processed += 1
+                except Exception as e:
+                    db.session.rollback()
+                    failed += 1
+                    click.echo(f"Failed {file_url}: {e}", err=True)
+            fill()
+            click.echo(f"{processed + failed}/{len(file_urls)} files done ({failed} failed).")
+
+
+def _store_derivatives(result):
+    Note.query.filter_by(file_url=result['file_url']).update({
+        Note.file_size: result['file_size'],
+        Note.page_count: result['page_count']
+    }, synchronize_session=False)
+    db.session.commit()
+    store_preview(result['file_url'], result['file_hash'], result['preview'])
+
+
+@notes_cli.command('archive')
+@click.option('--session', 'session_ids', type=int, multiple=True,
+              help='Only archive notes of this inactive session (repeatable). Defaults to every inactive session.')
+@click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True, help='Rows moved per transaction.')
+@click.option('--logs-before', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Archive logs older than this date instead of those older than the active session.')
+@click.option('--skip-logs', is_flag=True, help='Only archive notes.')
+@click.option('--dry-run', is_flag=True, help='Only count what would be archived.')
+def archive(session_ids, batch_size, logs_before, skip_logs, dry_run):
+    """Moves notes and logs of closed academic sessions to the archive tables.
+
+    Each batch is its own transaction, so the command can be stopped at any
+    time and run again to carry on. Archived rows stay readable through the
+    ``include_archived=true`` flag of the note and log endpoints.
+    """
+    before = None if skip_logs else (logs_before or log_cutoff())
+    if not skip_logs and before is None:
+        click.echo("No active session with an activation date; pass --logs-before to archive logs.")
+
+    if dry_run:
+        query = archivable_notes(session_ids)
+        click.echo(f"{query.count() if query is not None else 0} notes to archive.")
+        if before:
+            click.echo(f"{Log.query.filter(Log.timestamp < before).count()} logs older than {before} to archive.")
+        return
+
+    notes = archive_notes(session_ids, batch_size,
+                          on_batch=lambda done: click.echo(f"{done} notes archived."))
+    logs = archive_logs(before, batch_size, on_batch=lambda done: click.echo(f"{done} logs archived.")) if before else 0
+    click.echo(f"Archived {notes} notes and {logs} logs.")
+    if notes or logs:
+        log_activity('archive_run', f"Archived {notes} notes and {logs} logs.")
+
+
+@notes_cli.command('rebase-trending')
+@click.argument('old_epoch', type=click.DateTime(formats=['%Y-%m-%d']))
+def rebase_trending(old_epoch):
+    """Re-anchors stored trending scores after trending.EPOCH was moved forward from OLD_EPOCH.
+
+    Run it once, with the new code deployed but no worker serving yet; see
+    trending.rebase_scores.
+    """
+    if old_epoch >= trending.EPOCH:
+        raise click.BadParameter(f"must be before the current EPOCH ({trending.EPOCH:%Y-%m-%d}).",
+                                 param_hint='OLD_EPOCH')
+    factor = trending.rebase_scores(old_epoch)
+    if factor is None:
+        click.echo(f"Scores were already rebased from {old_epoch:%Y-%m-%d} to {trending.EPOCH:%Y-%m-%d}.")
+    else:
+        click.echo(f"Divided every trending score by {factor:.6g}.")
+
+
+@users_cli.command('import')
+@click.argument('roster', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Roster format; defaults to the file extension.')
+@click.option('--hash-workers', type=int, default=None, help='Threads hashing passwords. Defaults to USER_IMPORT_HASH_WORKERS.')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Users inserted per transaction.')
+@click.option('--dry-run', is_flag=True, help='Validate every row without creating anyone.')
+def import_users(roster, fmt, hash_workers, batch_size, dry_run):
+    """Creates users from a CSV or NDJSON roster and prints the rows that were rejected.
+
+    Columns: email, username, password, role, college_id, department, section.
+    """
+    fmt = roster_format(roster.name, fmt)
+    if not fmt:
+        raise click.UsageError("Cannot tell the roster format from the file name; pass --format.")
+
+    importer = RosterImporter(hash_workers=hash_workers or current_app.config['USER_IMPORT_HASH_WORKERS'],
+                              batch_size=batch_size, dry_run=dry_run)
+    report = importer.run(read_roster(roster, fmt), on_batch=lambda report: click.echo(
+        f"{report['rows']} rows read, {report['created']} users {'valid' if dry_run else 'created'}, "
+        f"{report['failed']} rejected."))
+
+    for error in report['errors']:
+        click.echo(f"Row {error['row']} ({error['email'] or '-'}): {error['error']}", err=True)
+    if report['failed'] > len(report['errors']):
+        click.echo(f"... and {report['failed'] - len(report['errors'])} more rejected rows.", err=True)
+    if report['random_passwords']:
+        click.echo(f"{report['random_passwords']} users got a random password and must use forgot-password to sign in.")
+    if report['created'] and not dry_run:
+        log_activity('users_imported', f"Imported {report['created']} users from '{roster.name}' "
+                                       f"({report['failed']} rows rejected).")
@@ -0,0 +1,73 @@
+import gzip
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIMETYPES = ['application/json', 'text/html', 'text/plain', 'text/csv']
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level)
+
+
+def _brotli(data, level):
+    # Brotli quality runs 0-11; map the shared 1-9 level onto it
+    return brotli.compress(data, quality=min(11, level + 2))
+
+
+class Compress:
+    """Compresses large responses according to the client's Accept-Encoding.
+
+    Responses below ``COMPRESS_MIN_SIZE`` bytes, streamed responses and
+    anything already encoded are passed through untouched.
+    """
+
+    def __init__(self, app=None):
+        self.encoders = {'gzip': _gzip}
+        if brotli is not None:
+            self.encoders['br'] = _brotli
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+        app.after_request(self.after_request)
+
+    def choose_encoding(self, accept_encodings):
+        best, best_quality = None, 0
+        for encoding in self.encoders:
+            quality = accept_encodings.quality(encoding)
+            # Prefer brotli over gzip when the client rates them equally
+            if quality > best_quality or (quality == best_quality and quality and encoding == 'br'):
+                best, best_quality = encoding, quality
+        return best
+
+    def after_request(self, response):
+        config = current_app.config
+
+        if (response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in config['COMPRESS_MIMETYPES']):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = self.choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        response.set_data(self.encoders[encoding](data, config['COMPRESS_LEVEL']))
+        response.headers['Content-Encoding'] = encoding
+        return response
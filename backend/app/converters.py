@@ -1,16 +1,69 @@
-import img2pdf
-from PIL import Image
 import io
+import time
+
+COLOR_MODES = ('color', 'grayscale', 'bilevel')
+
+# Photos are scaled to fit an A4 page at the target DPI
+PAGE_LONG_INCHES = 11.69
+PAGE_SHORT_INCHES = 8.27
+
+# Grayscale level above which a pixel counts as paper when binarizing text pages
+BILEVEL_THRESHOLD = 160
+
+
+def preprocess_image(file, target_dpi=150, color_mode='color', jpeg_quality=75):
+    """Re-encodes an uploaded photo for a PDF page.
+
+    The image is turned upright from its EXIF orientation, shrunk to fit A4
+    at ``target_dpi`` and converted to ``color_mode``. Color and grayscale
+    pages become JPEGs at ``jpeg_quality``; bilevel pages become CCITT G4
+    TIFFs, which img2pdf embeds without re-encoding.
+    """
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(file))
+
+    long_side = round(PAGE_LONG_INCHES * target_dpi)
+    short_side = round(PAGE_SHORT_INCHES * target_dpi)
+    box = (long_side, short_side) if image.width >= image.height else (short_side, long_side)
+    image.thumbnail(box, Image.LANCZOS)
+
+    # Smaller images get a lower DPI so every page still comes out A4-sized
+    dpi = max(1, round(target_dpi * max(image.width / box[0], image.height / box[1])))
+
+    buffer = io.BytesIO()
+    if color_mode == 'bilevel':
+        image = image.convert('L').point(lambda p: 255 if p > BILEVEL_THRESHOLD else 0, mode='1')
+        image.save(buffer, 'TIFF', compression='group4', dpi=(dpi, dpi))
+    else:
+        image = image.convert('L' if color_mode == 'grayscale' else 'RGB')
+        image.save(buffer, 'JPEG', quality=jpeg_quality, optimize=True, dpi=(dpi, dpi))
+    return buffer.getvalue()
+
+
+def convert_images_to_pdf(image_files, preprocess=False, target_dpi=150, color_mode='color', jpeg_quality=75):
+    # Imported on first use so workers and tests that never convert images skip them; see preload.py
+    import img2pdf
+    from PIL import Image
 
-def convert_images_to_pdf(image_files):
     try:
+        start = time.perf_counter()
         image_bytes_list = []
-        
+        original_size = 0
+
         for file in image_files:
             try:
                 Image.open(file).verify()
                 file.seek(0)
-                image_bytes_list.append(file.read())
+                original = file.read()
+                original_size += len(original)
+                if preprocess:
+                    file.seek(0)
+                    processed = preprocess_image(file, target_dpi, color_mode, jpeg_quality)
+                    # img2pdf applies EXIF rotation itself, so a color original that is already small is kept
+                    if color_mode != 'color' or len(processed) < len(original):
+                        original = processed
+                image_bytes_list.append(original)
             except Exception as e:
                 print(f"Skipping invalid image file {file.filename}: {e}")
                 continue
@@ -19,9 +72,13 @@ def convert_images_to_pdf(image_files):
             return None
 
         pdf_bytes = img2pdf.convert(image_bytes_list)
-        
+
+        print(f"Converted {len(image_bytes_list)} images to PDF "
+              f"({'preprocessed, ' + color_mode if preprocess else 'as uploaded'}): "
+              f"{original_size} -> {len(pdf_bytes)} bytes in {(time.perf_counter() - start) * 1000:.0f} ms")
+
         return io.BytesIO(pdf_bytes)
 
     except Exception as e:
         print(f"Error during image to PDF conversion: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,153 @@
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+
+FIELDS = ('views', 'downloads')
+UPSERT_BATCH_SIZE = 1000
+
+
+def upsert_counters(pending):
+    """Adds ``{note_id: [views, downloads]}`` to ``note_counters`` and the notes' trending scores, in batches, and commits."""
+    from sqlalchemy.dialects import mysql, postgresql, sqlite
+    from sqlalchemy import bindparam
+    from . import db
+    from .models import Note, NoteCounter
+    from .trending import engagement_score
+
+    table = NoteCounter.__table__
+    notes = Note.__table__
+    add_score = notes.update().where(notes.c.id == bindparam('b_note_id')).values(
+        trending_score=notes.c.trending_score + bindparam('b_score'))
+    dialect = db.session.get_bind().dialect.name
+    now = datetime.utcnow()
+
+    # Sorted so concurrent flushes from several workers lock rows in the same order
+    note_ids = sorted(pending)
+    for start in range(0, len(note_ids), UPSERT_BATCH_SIZE):
+        batch = note_ids[start:start + UPSERT_BATCH_SIZE]
+        # Counts for notes deleted since they were recorded are dropped
+        existing = {row.id: row.is_verified
+                    for row in db.session.query(Note.id, Note.is_verified).filter(Note.id.in_(batch))}
+        rows = [
+            {'note_id': note_id, 'views': pending[note_id][0], 'downloads': pending[note_id][1], 'updated_at': now}
+            for note_id in batch if note_id in existing
+        ]
+        if not rows:
+            continue
+
+        if dialect == 'mysql':
+            stmt = mysql.insert(table)
+            stmt = stmt.on_duplicate_key_update(
+                views=table.c.views + stmt.inserted.views,
+                downloads=table.c.downloads + stmt.inserted.downloads,
+                updated_at=stmt.inserted.updated_at
+            )
+        else:
+            # PostgreSQL and SQLite share the ON CONFLICT syntax
+            stmt = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.note_id],
+                set_={
+                    'views': table.c.views + stmt.excluded.views,
+                    'downloads': table.c.downloads + stmt.excluded.downloads,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            )
+        db.session.execute(stmt, rows)
+        # The same events feed the trending score; see trending.py
+        db.session.execute(add_score, [
+            {'b_note_id': row['note_id'],
+             'b_score': engagement_score(row['views'], row['downloads'], existing[row['note_id']], now)}
+            for row in rows
+        ])
+    db.session.commit()
+
+
+class CounterBuffer:
+    """Per-worker write-behind buffer for note view and download counts.
+
+    ``record`` only touches an in-memory dict. A background thread, started
+    on first use in each worker process, flushes the totals every
+    ``COUNTER_FLUSH_SECONDS`` with ``upsert_counters``, and a last flush runs
+    at interpreter exit, so a worker that dies loses at most one interval.
+    A flush that fails is rolled back as a whole and its counts go back in
+    the buffer, so a database outage delays them instead of losing them.
+    """
+
+    def __init__(self, app=None):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._pid = None
+        self.stats = {'flushes': 0, 'flushed_notes': 0, 'errors': 0, 'last_flush': None}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COUNTER_FLUSH_SECONDS', 30)
+        app.extensions['counter_buffer'] = self
+
+    def record(self, app, note_id, field):
+        index = FIELDS.index(field)
+        with self._lock:
+            counts = self._pending.get(note_id)
+            if counts is None:
+                counts = self._pending[note_id] = [0, 0]
+            counts[index] += 1
+        if self._pid != os.getpid():
+            self._start(app)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._app is None:
+            return 0
+
+        with self._app.app_context():
+            try:
+                upsert_counters(pending)
+            except Exception as e:
+                from . import db
+                db.session.rollback()
+                # Put the counts back so the next tick retries them with whatever arrived since
+                self._merge(pending)
+                self.stats['errors'] += 1
+                print(f"Error flushing counters for {len(pending)} notes: {e}")
+                return 0
+        self.stats['flushes'] += 1
+        self.stats['flushed_notes'] += len(pending)
+        self.stats['last_flush'] = datetime.utcnow()
+        return len(pending)
+
+    def _merge(self, pending):
+        with self._lock:
+            for note_id, (views, downloads) in pending.items():
+                counts = self._pending.get(note_id)
+                if counts is None:
+                    self._pending[note_id] = [views, downloads]
+                else:
+                    counts[0] += views
+                    counts[1] += downloads
+
+    def _start(self, app):
+        with self._lock:
+            # Checked by pid so each forked worker starts its own thread
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._app = app
+        interval = app.config['COUNTER_FLUSH_SECONDS']
+
+        def _run():
+            while True:
+                time.sleep(interval)
+                self.flush()
+
+        threading.Thread(target=_run, name='counter-flush', daemon=True).start()
+        atexit.register(self.flush)
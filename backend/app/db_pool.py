@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from flask import has_request_context, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Recent checkout waits kept per pool for the percentiles in pool_status
+WAIT_SAMPLES = 1000
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that times how long every checkout waits for a connection.
+
+    The wait covers queueing for a free connection and opening a new one
+    when the pool may overflow, but not the pre-ping. Checkouts slower than
+    ``slow_checkout_seconds`` (passed through ``SQLALCHEMY_ENGINE_OPTIONS``
+    like any other pool argument) print a warning naming the request.
+    Counters are per worker process.
+    """
+
+    def __init__(self, creator, slow_checkout_seconds=0.1, **kw):
+        super().__init__(creator, **kw)
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.stats = {'checkouts': 0, 'slow_checkouts': 0, 'timeouts': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0}
+
+    def recreate(self):
+        # dispose() replaces the pool (e.g. after a gunicorn fork); keep the threshold, start fresh counters
+        pool = super().recreate()
+        pool.slow_checkout_seconds = self.slow_checkout_seconds
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.stats['timeouts'] += 1
+            print(f"Database pool exhausted: no connection within {self._timeout}s ({self.status()}){_request_label()}")
+            raise
+        self._record(time.perf_counter() - start)
+        return connection
+
+    def _record(self, waited):
+        waited_ms = waited * 1000
+        with self._stats_lock:
+            self.stats['checkouts'] += 1
+            self.stats['total_wait_ms'] += waited_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], waited_ms)
+            self._waits.append(waited_ms)
+            slow = waited >= self.slow_checkout_seconds
+            if slow:
+                self.stats['slow_checkouts'] += 1
+        if slow:
+            print(f"Slow database pool checkout: waited {waited_ms:.0f} ms "
+                  f"(checked out {self.checkedout()}, overflow {max(0, self.overflow())}){_request_label()}")
+
+    def wait_percentiles(self):
+        with self._stats_lock:
+            waits = sorted(self._waits)
+        if not waits:
+            return {'p50_wait_ms': None, 'p95_wait_ms': None}
+        return {'p50_wait_ms': round(waits[len(waits) // 2], 2),
+                'p95_wait_ms': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2)}
+
+
+def _request_label():
+    return f" during {request.method} {request.path}" if has_request_context() else ""
+
+
+def engine_options(url, config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the DB_POOL_* settings; they apply to every bind."""
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING'], 'pool_recycle': config['DB_POOL_RECYCLE']}
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory SQLite must keep its single shared connection
+        return options
+    options.update(
+        poolclass=MonitoredQueuePool,
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        slow_checkout_seconds=config['DB_POOL_SLOW_CHECKOUT_MS'] / 1000
+    )
+    return options
+
+
+def pool_status(engine):
+    """Connections and checkout waits of one engine's pool, in this worker."""
+    pool = engine.pool
+    if not isinstance(pool, MonitoredQueuePool):
+        return {'pool': type(pool).__name__}
+    with pool._stats_lock:
+        stats = dict(pool.stats)
+    checkouts = stats.pop('checkouts')
+    total_wait_ms = stats.pop('total_wait_ms')
+    return dict(
+        stats,
+        pool='MonitoredQueuePool',
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=max(0, pool.overflow()),
+        checkouts=checkouts,
+        avg_wait_ms=round(total_wait_ms / checkouts, 2) if checkouts else None,
+        max_wait_ms=round(stats['max_wait_ms'], 2),
+        **pool.wait_percentiles()
+    )
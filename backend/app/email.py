@@ -1,9 +1,11 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 
 def send_password_reset_email(user, token):
+    # Only needed when someone resets a password, so not at import time
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
     sender_email = os.getenv('MAIL_USERNAME')
     receiver_email = user.email
     password = os.getenv('MAIL_PASSWORD')
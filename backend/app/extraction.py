@@ -0,0 +1,169 @@
+import io
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Pages are stored joined by form feeds, which never appear in extracted text
+PAGE_SEPARATOR = '\f'
+
+PREVIEW_WIDTH = 320
+PREVIEW_QUALITY = 70
+
+
+def extract_pdf_text(pdf, max_pages=None):
+    """Returns the text of each page of ``pdf``, given as bytes or a path. Runs inside the extraction processes."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf)
+    pages = reader.pages if max_pages is None else reader.pages[:max_pages]
+    return [(page.extract_text() or '').replace(PAGE_SEPARATOR, ' ') for page in pages]
+
+
+def count_pdf_pages(file):
+    from pypdf import PdfReader
+
+    try:
+        file.seek(0)
+        return len(PdfReader(file).pages)
+    except Exception as e:
+        print(f"Could not count PDF pages: {e}")
+        return None
+    finally:
+        file.seek(0)
+
+
+def render_pdf_preview(pdf, width=PREVIEW_WIDTH, quality=PREVIEW_QUALITY):
+    """Returns a JPEG of the first page of ``pdf`` (bytes or a path) scaled to ``width`` pixels.
+
+    Returns None when pypdfium2 is not installed.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+
+    document = pdfium.PdfDocument(pdf)
+    try:
+        page = document[0]
+        image = page.render(scale=width / page.get_width()).to_pil().convert('RGB')
+    finally:
+        document.close()
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def build_derivatives(file_url, timeout=60):
+    """Downloads a stored note file and computes its hash, size, page count and preview.
+
+    Used by the backfill command, so the download and rendering both happen
+    inside the pool process.
+    """
+    import hashlib
+    import requests
+
+    response = requests.get(file_url, timeout=timeout)
+    response.raise_for_status()
+    pdf_bytes = response.content
+    return {
+        'file_url': file_url,
+        'file_hash': hashlib.sha256(pdf_bytes).hexdigest(),
+        'file_size': len(pdf_bytes),
+        'page_count': count_pdf_pages(io.BytesIO(pdf_bytes)),
+        'preview': render_pdf_preview(pdf_bytes)
+    }
+
+
+def compress_pages(pages):
+    return zlib.compress(PAGE_SEPARATOR.join(pages).encode('utf-8'), 6)
+
+
+def decompress_pages(content):
+    return zlib.decompress(content).decode('utf-8').split(PAGE_SEPARATOR)
+
+
+class TextExtractor:
+    """Runs PDF text extraction and preview rendering in a process pool so uploads never wait on them.
+
+    The pool is created on first use, after any gunicorn fork, with the
+    'spawn' start method so children do not inherit open DB connections.
+    ``on_done`` callbacks run in a pool management thread inside an app
+    context of the submitting app.
+    """
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TEXT_EXTRACTION_WORKERS', 2)
+        app.config.setdefault('TEXT_EXTRACTION_MAX_PAGES', 500)
+        app.extensions['text_extractor'] = self
+
+    def _get_pool(self, app):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=app.config['TEXT_EXTRACTION_WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def submit(self, app, note_id, pdf, on_done):
+        """Extracts the text of ``pdf`` (bytes or a path) and calls ``on_done(note_id, pages)``."""
+        return self.run(app, note_id, extract_pdf_text, (pdf, app.config['TEXT_EXTRACTION_MAX_PAGES']), on_done)
+
+    def run(self, app, note_id, job, args, on_done):
+        """Runs ``job(*args)`` in the pool and calls ``on_done(note_id, result)`` with its result."""
+        if not app.config['TEXT_EXTRACTION_WORKERS']:
+            return None
+
+        try:
+            future = self._get_pool(app).submit(job, *args)
+        except Exception as e:
+            # Background processing is best-effort; the upload itself has already succeeded
+            print(f"Error queueing {job.__name__} for note ID {note_id}: {e}")
+            return None
+
+        def _callback(done):
+            try:
+                result = done.result()
+            except Exception as e:
+                print(f"Error in {job.__name__} for note ID {note_id}: {e}")
+                return
+            with app.app_context():
+                try:
+                    on_done(note_id, result)
+                except Exception as e:
+                    print(f"Error storing {job.__name__} result for note ID {note_id}: {e}")
+
+        future.add_done_callback(_callback)
+        return future
+
+    def when_done(self, futures, callback):
+        """Calls ``callback()`` once every future from ``run`` has finished, including their ``on_done``."""
+        futures = [future for future in futures if future is not None]
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def _done(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                callback()
+
+        if not futures:
+            callback()
+        for future in futures:
+            future.add_done_callback(_done)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
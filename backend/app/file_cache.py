@@ -0,0 +1,154 @@
+import hashlib
+import os
+import secrets
+import tempfile
+import threading
+import requests
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class FileCache:
+    """Size-bounded LRU cache of note files on local disk, for the file proxy.
+
+    Entries are named by a key that identifies the content for good (the
+    file's SHA-256 when it is known, otherwise a hash of its never-reused
+    storage URL), so the key doubles as a strong ETag and entries never
+    need revalidation. The directory is the only state, shared by every
+    worker of a host: a hit bumps the file's mtime, and after each download
+    the directory is scanned and the least recently used files are removed
+    until it fits in ``FILE_CACHE_MAX_BYTES``, whoever fetched them.
+
+    Counters are per worker. ``fetched_bytes`` is what came from storage and
+    ``served_bytes`` what the proxy sent to clients; the difference is the
+    storage egress the cache saved.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._fetch_locks = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0, 'fetched_bytes': 0, 'served_bytes': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FILE_PROXY_ENABLED', False)
+        app.config.setdefault('FILE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'notehub-file-cache'))
+        app.config.setdefault('FILE_CACHE_MAX_BYTES', 1024 * 1024 * 1024)
+        app.extensions['file_cache'] = self
+
+    @staticmethod
+    def key_for(file_url, file_hash=None):
+        return file_hash or 'u' + hashlib.sha256(file_url.encode()).hexdigest()
+
+    def get(self, directory, max_bytes, key, file_url, timeout=60):
+        """Returns the local path of the file, downloading it on a miss; None if it cannot be fetched.
+
+        Another worker may evict the file before the caller opens it; the
+        caller then asks again, which fetches it anew.
+        """
+        path = os.path.join(directory, key)
+        if self._hit(path):
+            return path
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        # One download per key; concurrent misses wait for it instead of fetching again
+        with fetch_lock:
+            if self._hit(path):
+                return path
+            with self._lock:
+                self.stats['misses'] += 1
+            try:
+                os.makedirs(directory, exist_ok=True)
+                size = self._download(file_url, path, timeout)
+            except Exception as e:
+                print(f"Error fetching {file_url} into the file cache: {e}")
+                with self._lock:
+                    self.stats['errors'] += 1
+                return None
+            finally:
+                with self._lock:
+                    self._fetch_locks.pop(key, None)
+
+        with self._lock:
+            self.stats['fetched_bytes'] += size
+        self._evict(directory, max_bytes, keep=key)
+        return path
+
+    def count_served(self, size):
+        with self._lock:
+            self.stats['served_bytes'] += size or 0
+
+    def snapshot(self, directory):
+        files = self._scan(directory)
+        with self._lock:
+            return dict(self.stats, entries=len(files), bytes=sum(size for _, _, size in files))
+
+    def _hit(self, path):
+        try:
+            # The new mtime marks the file as recently used for every worker's eviction scan
+            os.utime(path)
+        except OSError:
+            return False
+        with self._lock:
+            self.stats['hits'] += 1
+        return True
+
+    def _download(self, file_url, path, timeout):
+        temp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        size = 0
+        try:
+            with requests.get(file_url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return size
+
+    @staticmethod
+    def _scan(directory):
+        """``(mtime, name, size)`` of every finished file in the directory, oldest first."""
+        files = []
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return files
+        for entry in entries:
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+            except FileNotFoundError:
+                # Evicted by another worker during the scan
+                pass
+        files.sort()
+        return files
+
+    def _evict(self, directory, max_bytes, keep):
+        # Scanning on every miss keeps the bound on the directory, not per worker;
+        # a miss is a storage download anyway, so the scan is cheap by comparison
+        with self._evict_lock:
+            files = self._scan(directory)
+            total = sum(size for _, _, size in files)
+            for _, name, size in files:
+                if total <= max_bytes:
+                    break
+                if name == keep:
+                    continue
+                try:
+                    os.remove(os.path.join(directory, name))
+                    with self._lock:
+                        self.stats['evictions'] += 1
+                except FileNotFoundError:
+                    # Another worker evicted it first
+                    pass
+                total -= size
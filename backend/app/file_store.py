@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+from . import db
+from .models import StoredFile, Note
+from .utils import (upload_file_to_firebase, upload_bytes_to_firebase, delete_file_from_firebase,
+                    compute_file_hash, preview_object_name)
+from sqlalchemy.exc import IntegrityError
+
+
+def acquire_file(file, filename, content_type, file_hash=None, size=None):
+    """Returns ``(file_url, reused)`` for ``file``, uploading it only if its content is new.
+
+    The reference-count change is left in the session and commits with the
+    note that uses the file. Returns ``(None, False)`` if the upload fails.
+    Pass ``file_hash`` and ``size`` when the caller has already hashed it.
+    """
+    if file_hash is None:
+        file_hash, size = compute_file_hash(file)
+
+    file_url = _reuse(file_hash)
+    if file_url:
+        return file_url, True
+
+    file_url = upload_file_to_firebase(file, filename, content_type)
+    if not file_url:
+        return None, False
+    return _register(file_hash, size, file_url)
+
+
+def acquire_files(files, max_workers):
+    """Batch version of ``acquire_file`` for ``(file, filename, content_type, file_hash, size)`` tuples.
+
+    New content is uploaded once per distinct hash, up to ``max_workers``
+    transfers at a time; all database work stays on the calling thread.
+    Returns ``(file_url, reused)`` for each tuple, in order.
+    """
+    hashes = {file_hash for _, _, _, file_hash, _ in files}
+    stored = {row.file_hash for row in StoredFile.query.with_entities(StoredFile.file_hash)
+              .filter(StoredFile.file_hash.in_(hashes))}
+
+    pending = {}
+    for file, filename, content_type, file_hash, _ in files:
+        if file_hash not in stored and file_hash not in pending:
+            pending[file_hash] = (file, filename, content_type)
+
+    uploaded = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            uploaded = dict(zip(pending, pool.map(lambda args: upload_file_to_firebase(*args), pending.values())))
+
+    results = []
+    for _, _, _, file_hash, size in files:
+        if file_hash in uploaded:
+            file_url = uploaded.pop(file_hash)
+            results.append(_register(file_hash, size, file_url) if file_url else (None, False))
+        else:
+            # Stored before, or uploaded for an earlier item of this batch
+            file_url = _reuse(file_hash)
+            results.append((file_url, True) if file_url else (None, False))
+    return results
+
+
+def _reuse(file_hash):
+    existing = StoredFile.query.filter_by(file_hash=file_hash).first()
+    if existing and _add_reference(existing.id):
+        return existing.file_url
+    return None
+
+
+def _register(file_hash, size, file_url):
+    try:
+        with db.session.begin_nested():
+            db.session.add(StoredFile(file_hash=file_hash, file_url=file_url, size=size, ref_count=1))
+    except IntegrityError:
+        # Another request stored the same content first; use its copy instead of ours
+        delete_file_from_firebase(file_url)
+        existing_url = _reuse(file_hash)
+        if existing_url:
+            return existing_url, True
+        return None, False
+
+    return file_url, False
+
+
+def _add_reference(stored_file_id):
+    # Conditional so a blob whose last reference is being dropped is not resurrected
+    updated = StoredFile.query.filter(
+        StoredFile.id == stored_file_id,
+        StoredFile.ref_count > 0
+    ).update({StoredFile.ref_count: StoredFile.ref_count + 1}, synchronize_session=False)
+    return updated == 1
+
+
+def release_file(file_url):
+    """Drops one reference to ``file_url``; returns True when the blob itself should be deleted.
+
+    Delete the blob only after the surrounding transaction commits.
+    """
+    stored = StoredFile.query.filter_by(file_url=file_url).first()
+    if not stored:
+        # Uploaded before deduplication existed, so nothing else shares it
+        return True
+
+    StoredFile.query.filter_by(id=stored.id).update(
+        {StoredFile.ref_count: StoredFile.ref_count - 1}, synchronize_session=False)
+    deleted = StoredFile.query.filter(
+        StoredFile.id == stored.id,
+        StoredFile.ref_count <= 0
+    ).delete(synchronize_session=False)
+    return deleted == 1
+
+
+def store_preview(file_url, file_hash, preview):
+    """Uploads a rendered preview under its deterministic key and links it to every note using ``file_url``.
+
+    Commits, so call it outside of any request transaction.
+    """
+    if not preview:
+        return None
+    preview_url = upload_bytes_to_firebase(preview, preview_object_name(file_hash), 'image/jpeg')
+    if preview_url:
+        Note.query.filter_by(file_url=file_url).update({Note.preview_url: preview_url}, synchronize_session=False)
+        db.session.commit()
+    return preview_url
+
+
+def copy_derivatives(file_url, note):
+    # A shared file already has its preview; returns False if it is still being rendered
+    source = Note.query.filter(
+        Note.file_url == file_url,
+        Note.id != note.id,
+        Note.preview_url.isnot(None)
+    ).first()
+    if not source:
+        return False
+    note.preview_url = source.preview_url
+    db.session.commit()
+    return True
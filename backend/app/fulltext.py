@@ -0,0 +1,68 @@
+import re
+from .indexing import RebuildableIndex, normalize
+
+_WORD = re.compile(r'\w{2,}')
+
+
+def tokenize(text):
+    return set(_WORD.findall(normalize(text)))
+
+
+class FullTextIndex(RebuildableIndex):
+    """Word-level inverted index over the text extracted from note files.
+
+    A search returns the ids of the documents that contain every query
+    word, newest (highest id) first.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}
+        self._doc_words = {}
+
+    def __len__(self):
+        return len(self._doc_words)
+
+    def _load(self, items):
+        postings, doc_words = {}, {}
+        for doc_id, text in items:
+            words = tokenize(text)
+            doc_words[doc_id] = words
+            for word in words:
+                postings.setdefault(word, set()).add(doc_id)
+        with self._lock:
+            self._postings, self._doc_words = postings, doc_words
+
+    def add(self, doc_id, text):
+        with self._lock:
+            self._remove(doc_id)
+            words = tokenize(text)
+            self._doc_words[doc_id] = words
+            for word in words:
+                self._postings.setdefault(word, set()).add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for word in self._doc_words.pop(doc_id, ()):
+            posting = self._postings.get(word)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[word]
+
+    def search(self, text, limit=None):
+        words = tokenize(text)
+        if not words:
+            return []
+        with self._lock:
+            # Intersect from the rarest word so the working set stays small
+            postings = sorted((self._postings.get(word, set()) for word in words), key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches &= posting
+                if not matches:
+                    break
+        return sorted(matches, reverse=True)[:limit]
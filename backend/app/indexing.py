@@ -0,0 +1,77 @@
+import re
+import threading
+import time
+import unicodedata
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    # Case- and accent-insensitive, with runs of whitespace collapsed
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+class RebuildableIndex:
+    """Base for per-worker in-memory indexes that are rebuilt from the database.
+
+    Subclasses implement ``_load(items)`` to swap in fresh contents. Writes
+    made in other workers never reach this process's copy, so the periodic
+    rebuild in ``ensure_fresh`` is what bounds their staleness.
+    """
+
+    def __init__(self):
+        self.built_at = None
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+
+    def _load(self, items):
+        raise NotImplementedError
+
+    def rebuild(self, items):
+        self._load(items)
+        self.built_at = time.monotonic()
+
+    def is_stale(self, max_age):
+        return self.built_at is None or time.monotonic() - self.built_at >= max_age
+
+    def ensure_fresh(self, load_items, max_age):
+        """Rebuilds from ``load_items()`` when the index is missing or older than ``max_age`` seconds."""
+        if not self.is_stale(max_age):
+            return
+        # Only one thread rebuilds; the rest keep serving the current contents
+        if not self._rebuild_lock.acquire(blocking=self.built_at is None):
+            return
+        try:
+            if self.is_stale(max_age):
+                self.rebuild(load_items())
+        finally:
+            self._rebuild_lock.release()
+
+    def ensure_fresh_in_background(self, app, load_items, max_age):
+        """Like ``ensure_fresh`` but rebuilds on a thread of its own, for indexes too slow to build in a request.
+
+        Requests keep reading the current contents meanwhile, which are empty
+        until the first build finishes.
+        """
+        if not self.is_stale(max_age) or not self._rebuild_lock.acquire(blocking=False):
+            return
+
+        def _run():
+            from . import db
+            try:
+                with app.app_context():
+                    try:
+                        if self.is_stale(max_age):
+                            self.rebuild(load_items())
+                    except Exception as e:
+                        print(f"Error rebuilding {type(self).__name__}: {e}")
+                    finally:
+                        db.session.remove()
+            finally:
+                self._rebuild_lock.release()
+
+        threading.Thread(target=_run, name=f'{type(self).__name__}-rebuild', daemon=True).start()
@@ -0,0 +1,57 @@
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Wire format used for every timestamp the API returns
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the stdlib encoder.
+
+    Routes can hand ``datetime`` values straight to ``jsonify``; they are
+    rendered as ``DATETIME_FORMAT`` by both backends so the payloads stay
+    identical whichever one is installed.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            if o.tzinfo is None:
+                # Same output as DATETIME_FORMAT, several times faster than strftime
+                return o.isoformat(sep=' ', timespec='seconds')
+            return o.strftime(DATETIME_FORMAT)
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._orjson_options()
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+
+        # Skip the str round-trip; the response body is bytes anyway
+        body = orjson.dumps(obj, default=self.default, option=options)
+        return self._app.response_class(body, mimetype=self.mimetype)
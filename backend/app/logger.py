@@ -3,14 +3,15 @@ from .models import Log
 from flask_jwt_extended import get_jwt_identity
 from datetime import datetime
 
-def log_activity(action, details=None):
-    user_id = None
-    try:
-        # Get user ID if the user is logged in
-        user_id = get_jwt_identity()
-    except Exception:
-        # No user is logged in (e.g., during signup)
-        pass
+def log_activity(action, details=None, user_id=None):
+    # Background jobs have no request to take the user from and pass it in
+    if user_id is None:
+        try:
+            # Get user ID if the user is logged in
+            user_id = get_jwt_identity()
+        except Exception:
+            # No user is logged in (e.g., during signup)
+            pass
 
     log_entry = Log(
         user_id=user_id,
@@ -0,0 +1,63 @@
+import hashlib
+import re
+import zlib
+import numpy as np
+from .indexing import normalize
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+_CHUNK = 4096
+_WORD = re.compile(r'\w+')
+
+# Fixed seed: signatures are stored, so every process must use the same permutations
+_rng = np.random.default_rng(20251019)
+_A = _rng.integers(1, 2**63, size=(NUM_PERM, 1), dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=(NUM_PERM, 1), dtype=np.uint64)
+
+
+def shingle_hashes(text):
+    words = _WORD.findall(normalize(text))
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    size = min(SHINGLE_WORDS, len(words))
+    shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def compute_signature(text):
+    """MinHash signature of the text's word 5-gram shingles, or None if there is no text.
+
+    Each permutation is a multiply-shift hash over 64-bit integers; the
+    wraparound of NumPy's uint64 multiply is the intended modulus.
+    """
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+
+    signature = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+    for start in range(0, len(hashes), _CHUNK):
+        chunk = hashes[start:start + _CHUNK]
+        permuted = (_A * chunk + _B) >> np.uint64(32)
+        np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype('<u4').tobytes()
+
+
+def band_hashes(signature):
+    # One signed 64-bit bucket per band, suitable for a BigInteger column
+    values = np.frombuffer(signature, dtype='<u4')
+    return [
+        int.from_bytes(hashlib.blake2b(values[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND].tobytes(), digest_size=8).digest(),
+                       'little', signed=True)
+        for i in range(BANDS)
+    ]
+
+
+def similarities(signature, others):
+    """Estimated Jaccard similarity of ``signature`` against each signature in ``others``."""
+    if not others:
+        return np.empty(0)
+    target = np.frombuffer(signature, dtype='<u4')
+    matrix = np.frombuffer(b''.join(others), dtype='<u4').reshape(len(others), NUM_PERM)
+    return (matrix == target).mean(axis=1)
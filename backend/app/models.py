@@ -1,9 +1,12 @@
 from . import db
 from datetime import datetime
+from sqlalchemy.dialects import mysql
 
 note_sections = db.Table('note_sections',
     db.Column('note_id', db.Integer, db.ForeignKey('notes.id'), primary_key=True),
-    db.Column('section_id', db.Integer, db.ForeignKey('sections.id'), primary_key=True)
+    db.Column('section_id', db.Integer, db.ForeignKey('sections.id'), primary_key=True),
+    # The primary key leads with note_id; feeds look notes up by section
+    db.Index('ix_note_sections_section_id_note_id', 'section_id', 'note_id')
 )
 
 professor_departments = db.Table('professor_departments',
@@ -39,10 +42,35 @@ class AcademicSession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     year_name = db.Column(db.String(50), unique=True, nullable=False) # e.g., "2025-2026"
     is_active = db.Column(db.Boolean, default=False, nullable=False)
+    # When the session last became the active one; logs written before it are archivable
+    activated_at = db.Column(db.DateTime, nullable=True)
     
     sections = db.relationship('Section', backref='academic_session', lazy=True)
     def __repr__(self): return f'<AcademicSession {self.year_name}>'
 
+class SessionRollover(db.Model):
+    __tablename__ = 'session_rollovers'
+    # One row per rollover job; rollover.py updates the counts as it goes so any worker can report progress
+    id = db.Column(db.Integer, primary_key=True)
+    source_session_id = db.Column(db.Integer, db.ForeignKey('academic_sessions.id'), nullable=False)
+    target_session_id = db.Column(db.Integer, db.ForeignKey('academic_sessions.id'), nullable=False)
+    activate = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, running, done, failed
+    sections_created = db.Column(db.Integer, nullable=False, default=0)
+    students_total = db.Column(db.Integer, nullable=False, default=0)
+    students_promoted = db.Column(db.Integer, nullable=False, default=0)
+    students_graduated = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    source_session = db.relationship('AcademicSession', foreign_keys=[source_session_id])
+    target_session = db.relationship('AcademicSession', foreign_keys=[target_session_id])
+
+    def __repr__(self): return f'<SessionRollover {self.id} {self.status}>'
+
 class Section(db.Model):
     __tablename__ = 'sections'
     id = db.Column(db.Integer, primary_key=True)
@@ -84,12 +112,42 @@ class User(db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+class UserImport(db.Model):
+    __tablename__ = 'user_imports'
+    # One row per roster import job; user_import.py updates the counts after every batch
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    dry_run = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, running, done, failed
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    random_passwords = db.Column(db.Integer, nullable=False, default=0)
+    # JSON list of {row, email, error}; up to 1,000 of them outgrow MySQL's 64 KB TEXT
+    errors = db.Column(db.Text().with_variant(mysql.MEDIUMTEXT(), 'mysql'), nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self): return f'<UserImport {self.id} {self.status}>'
+
 class Note(db.Model):
     __tablename__ = 'notes'
+    __table_args__ = (
+        db.Index('ix_notes_department_id_created_at', 'department_id', 'created_at'),
+        # Top-k trending per department or subject is a backwards scan of these
+        db.Index('ix_notes_department_id_trending_score', 'department_id', 'trending_score'),
+        db.Index('ix_notes_subject_trending_score', 'subject', 'trending_score'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    file_url = db.Column(db.String(255), nullable=False)
+    file_url = db.Column(db.String(255), nullable=False, index=True)
+    file_size = db.Column(db.BigInteger, nullable=True) # Bytes; null for notes not yet backfilled
+    page_count = db.Column(db.Integer, nullable=True)
+    preview_url = db.Column(db.String(255), nullable=True) # First-page JPEG, rendered after upload
+    trending_score = db.Column(db.Double, nullable=False, default=0.0, server_default='0', index=True) # See trending.py
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     subject = db.Column(db.String(100), nullable=False)
@@ -106,6 +164,73 @@ class Note(db.Model):
     def __repr__(self):
         return f'<Note {self.title}>'
 
+class StoredFile(db.Model):
+    __tablename__ = 'stored_files'
+    id = db.Column(db.Integer, primary_key=True)
+    file_hash = db.Column(db.String(64), unique=True, nullable=False) # SHA-256 of the content, hex
+    file_url = db.Column(db.String(255), unique=True, nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=1) # notes pointing at file_url
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoredFile {self.file_hash[:12]}>'
+
+class NoteText(db.Model):
+    __tablename__ = 'note_texts'
+    note_id = db.Column(db.Integer, db.ForeignKey('notes.id'), primary_key=True)
+    page_count = db.Column(db.Integer, nullable=False)
+    # zlib-compressed UTF-8, pages separated by form feeds (see extraction.py)
+    content = db.Column(db.LargeBinary(length=2**24 - 1), nullable=False)
+    extracted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    note = db.relationship('Note', backref=db.backref('text', uselist=False, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<NoteText {self.note_id}>'
+
+class NoteSignature(db.Model):
+    __tablename__ = 'note_signatures'
+    note_id = db.Column(db.Integer, db.ForeignKey('notes.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary(length=512), nullable=False) # 128 MinHash values, little-endian uint32
+    # Closest earlier note found when the signature was computed, for moderation
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('notes.id'), nullable=True)
+    duplicate_similarity = db.Column(db.Float, nullable=True)
+
+    note = db.relationship('Note', foreign_keys=[note_id],
+                           backref=db.backref('signature', uselist=False, cascade='all, delete-orphan'))
+    duplicate_of = db.relationship('Note', foreign_keys=[duplicate_of_id])
+
+    def __repr__(self):
+        return f'<NoteSignature {self.note_id}>'
+
+class NoteLshBucket(db.Model):
+    __tablename__ = 'note_lsh_buckets'
+    # Primary key order serves the (band, bucket) lookups of a near-duplicate query
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    note_id = db.Column(db.Integer, db.ForeignKey('notes.id'), primary_key=True)
+
+    note = db.relationship('Note', backref=db.backref('lsh_buckets', cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<NoteLshBucket {self.band}:{self.bucket}>'
+
+class NoteCounter(db.Model):
+    __tablename__ = 'note_counters'
+    # Written only by the batched upserts of counters.py, never per request
+    note_id = db.Column(db.Integer, db.ForeignKey('notes.id'), primary_key=True)
+    views = db.Column(db.BigInteger, nullable=False, default=0)
+    downloads = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # selectin: note lists load every counter in one extra query
+    note = db.relationship('Note', backref=db.backref('counter', uselist=False, lazy='selectin',
+                                                      cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<NoteCounter {self.note_id}>'
+
 class Log(db.Model):
     __tablename__ = 'logs'
     id = db.Column(db.Integer, primary_key=True)
@@ -115,4 +240,70 @@ class Log(db.Model):
     details = db.Column(db.String(255), nullable=True)
 
     def __repr__(self):
-        return f'<Log {self.action}>'
\ No newline at end of file
+        return f'<Log {self.action}>'
+
+# Archive tier (see archive.py): notes and logs of closed academic sessions, moved out of the hot tables
+
+archived_note_sections = db.Table('archived_note_sections',
+    db.Column('note_id', db.Integer, db.ForeignKey('archived_notes.id'), primary_key=True),
+    db.Column('section_id', db.Integer, db.ForeignKey('sections.id'), primary_key=True)
+)
+
+class ArchivedNote(db.Model):
+    __tablename__ = 'archived_notes'
+    __table_args__ = (
+        db.Index('ix_archived_notes_department_id_created_at', 'department_id', 'created_at'),
+    )
+    # Same id as in notes, so links to an archived note keep working with ?include_archived=true
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    file_url = db.Column(db.String(255), nullable=False, index=True)
+    file_size = db.Column(db.BigInteger, nullable=True)
+    page_count = db.Column(db.Integer, nullable=True)
+    preview_url = db.Column(db.String(255), nullable=True)
+    trending_score = db.Column(db.Double, nullable=False, default=0.0, server_default='0')
+    created_at = db.Column(db.DateTime, nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+    semester = db.Column(db.Integer, nullable=False)
+    academic_year = db.Column(db.String(100), nullable=False)
+    is_verified = db.Column(db.Boolean, default=False, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), nullable=True)
+
+    # Folded in from note_counters and note_texts, which only reference hot notes
+    views = db.Column(db.BigInteger, nullable=False, default=0)
+    downloads = db.Column(db.BigInteger, nullable=False, default=0)
+    text_page_count = db.Column(db.Integer, nullable=True)
+    text_content = db.Column(db.LargeBinary(length=2**24 - 1), nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    author = db.relationship('User', lazy=True)
+    department = db.relationship('Department', lazy=True)
+    sections = db.relationship('Section', secondary=archived_note_sections, lazy=True)
+
+    def __repr__(self):
+        return f'<ArchivedNote {self.title}>'
+
+class ArchivedLog(db.Model):
+    __tablename__ = 'archived_logs'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    details = db.Column(db.String(255), nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    user = db.relationship('User', lazy=True)
+
+    def __repr__(self):
+        return f'<ArchivedLog {self.action}>'
+
+class ReplicaHeartbeat(db.Model):
+    __tablename__ = 'replica_heartbeats'
+    # Single row, bumped on the primary by replicas.py; its copy on the read replica shows the replication lag
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    beat_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<ReplicaHeartbeat {self.beat_at}>'
@@ -0,0 +1,32 @@
+import importlib
+
+# Heavy libraries the app only imports on first use. Importing them once in
+# a preloading master (gunicorn --preload) lets every forked worker share
+# the pages instead of each paying for the import on its first request.
+PRELOAD_MODULES = (
+    'PIL.Image',
+    'PIL.ImageOps',
+    'img2pdf',
+    'pypdf',
+    'pypdfium2',
+    'firebase_admin.storage',
+    'smtplib',
+    'email.mime.multipart',
+    'email.mime.text',
+)
+
+
+def preload_modules(modules=PRELOAD_MODULES):
+    """Imports ``modules`` without initializing anything; returns the ones that are not installed.
+
+    Only code is loaded here. Clients that hold sockets or threads (Firebase,
+    the extraction pool, the counter flush thread) are still created lazily
+    in each worker, after the fork.
+    """
+    missing = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            missing.append(name)
+    return missing
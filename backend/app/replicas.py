@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from datetime import datetime
+from flask import request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+# Sent back by the client after its own writes; see ReplicaRouter
+STICKY_HEADER = 'X-Read-Primary-Until'
+
+
+class RoutingSession(Session):
+    """``db.session`` that sends SELECTs to the ``replica`` bind while the request allows it.
+
+    ``ReplicaRouter`` sets ``info['use_replica']`` for read-only requests.
+    Flushes and every other statement go to the primary, and the first one
+    turns the flag off, so a request reads back its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('use_replica'):
+            if not self._flushing and isinstance(clause, Select):
+                return self._db.engines[REPLICA_BIND]
+            self.info['use_replica'] = False
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def primary_only(view):
+    """Marks a GET view whose reads must not lag behind the primary."""
+    view.primary_only = True
+    return view
+
+
+class ReplicaRouter:
+    """Routes reads of GET requests to the read replica configured as the ``replica`` bind.
+
+    Requests read from the primary instead when:
+
+    - the client wrote something within ``REPLICA_STICKY_SECONDS``: every
+      successful write answers with an ``X-Read-Primary-Until`` timestamp,
+      which the frontend sends back until it passes, so users see their own
+      changes whichever worker serves them;
+    - the replica is more than ``REPLICA_MAX_LAG_SECONDS`` behind, or the
+      lag is unknown (not checked yet, or the replica is unreachable);
+    - the view is marked ``@primary_only``.
+
+    The lag is measured by a thread in each worker, started on first use,
+    that every ``REPLICA_CHECK_SECONDS`` bumps the heartbeat row on the
+    primary and compares its previous value with the replica's copy. Without
+    a replica bind the router does nothing.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.lag = None
+        self.checked_at = None
+        self.stats = {'replica_reads': 0, 'sticky_reads': 0, 'lagging_reads': 0, 'check_errors': 0,
+                      'last_error': None}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 10)
+        app.config.setdefault('REPLICA_MAX_LAG_SECONDS', 5)
+        app.config.setdefault('REPLICA_CHECK_SECONDS', 2)
+        app.extensions['replica_router'] = self
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def before_request(self):
+        from flask import current_app
+        from . import db
+
+        if request.method not in READ_METHODS:
+            return
+        app = current_app._get_current_object()
+        if self._pid != os.getpid():
+            self._start(app)
+        view = app.view_functions.get(request.endpoint)
+        if view is None or getattr(view, 'primary_only', False):
+            return
+        try:
+            sticky_until = float(request.headers.get(STICKY_HEADER, 0))
+        except ValueError:
+            sticky_until = 0
+        if sticky_until > time.time():
+            self.stats['sticky_reads'] += 1
+            return
+        if not self.replica_fresh(app):
+            self.stats['lagging_reads'] += 1
+            return
+        db.session.info['use_replica'] = True
+        self.stats['replica_reads'] += 1
+
+    def after_request(self, response):
+        from flask import current_app
+
+        if request.method not in READ_METHODS and request.method != 'OPTIONS' and response.status_code < 400:
+            response.headers[STICKY_HEADER] = f"{time.time() + current_app.config['REPLICA_STICKY_SECONDS']:.3f}"
+        return response
+
+    def replica_fresh(self, app):
+        max_lag = app.config['REPLICA_MAX_LAG_SECONDS']
+        # A check older than a few intervals means the checker is stuck; trust neither it nor the replica
+        stale_after = 3 * app.config['REPLICA_CHECK_SECONDS']
+        return (self.lag is not None and self.lag <= max_lag
+                and self.checked_at is not None and time.monotonic() - self.checked_at <= stale_after)
+
+    def check(self, app):
+        """Bumps the primary's heartbeat and returns how far the replica's copy trailed its previous value."""
+        from sqlalchemy import select, update, insert
+        from sqlalchemy.exc import IntegrityError
+        from . import db
+        from .models import ReplicaHeartbeat
+
+        beat = select(ReplicaHeartbeat.beat_at).where(ReplicaHeartbeat.id == 1)
+        with app.app_context():
+            try:
+                # Bumped even when the replica is down, so its heartbeat can catch up once it is back
+                with db.engine.begin() as conn:
+                    primary_beat = conn.execute(beat).scalar()
+                    now = datetime.utcnow()
+                    if primary_beat is None:
+                        try:
+                            with conn.begin_nested():
+                                conn.execute(insert(ReplicaHeartbeat).values(id=1, beat_at=now))
+                        except IntegrityError:
+                            # Another worker created it first
+                            pass
+                    else:
+                        conn.execute(update(ReplicaHeartbeat).where(ReplicaHeartbeat.id == 1).values(beat_at=now))
+                with db.engines[REPLICA_BIND].connect() as conn:
+                    replica_beat = conn.execute(beat).scalar()
+            except Exception as e:
+                self.lag = None
+                self.stats['check_errors'] += 1
+                self.stats['last_error'] = str(e)[:255]
+                print(f"Error checking read replica: {e}")
+                return None
+
+        if primary_beat is None or replica_beat is None:
+            # Nothing to compare yet; the replica is only used once the first heartbeat reaches it
+            self.lag = None
+        else:
+            self.lag = max(0.0, (primary_beat - replica_beat).total_seconds())
+        self.checked_at = time.monotonic()
+        return self.lag
+
+    def snapshot(self, app):
+        return dict(self.stats, lag_seconds=self.lag, replica_fresh=self.replica_fresh(app))
+
+    def _start(self, app):
+        with self._lock:
+            # Checked by pid so each forked worker measures the lag itself
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        interval = app.config['REPLICA_CHECK_SECONDS']
+
+        def _run():
+            while True:
+                self.check(app)
+                time.sleep(interval)
+
+        threading.Thread(target=_run, name='replica-lag-check', daemon=True).start()
@@ -0,0 +1,148 @@
+import re
+import threading
+from datetime import datetime
+from sqlalchemy import and_, exists, func, literal, select
+from sqlalchemy.orm import aliased
+from . import db
+from .models import AcademicSession, Course, Department, Section, SessionRollover, User
+from .logger import log_activity
+
+ROLLOVER_BATCH_SIZE = 1000
+ROLLED_OVER_ROLES = ('student', 'moderator')
+
+_YEAR_NAME = re.compile(r'^(\d{4})([-/])(\d{2}|\d{4})$')
+
+
+def next_year_name(year_name):
+    """"2025-2026" -> "2026-2027" (also "2025-26" -> "2026-27"); None if the name has another shape."""
+    match = _YEAR_NAME.match(year_name.strip())
+    if not match:
+        return None
+    start, separator, end = match.groups()
+    return f"{int(start) + 1}{separator}{str(int(end) + 1).zfill(len(end))[-len(end):]}"
+
+
+def clone_sections(source_id, target_id):
+    """Copies every section of the source session into the target one year up, in one INSERT ... SELECT.
+
+    Final-year sections of a course are not carried over, and sections the
+    target already has are skipped, so running it again creates nothing.
+    Returns the number of sections created.
+    """
+    sections = Section.__table__
+    existing = aliased(Section)
+    source = select(
+        Section.name, Section.year + 1, Section.department_id, literal(target_id)
+    ).join(Department, Department.id == Section.department_id).join(
+        Course, Course.id == Department.course_id
+    ).where(
+        Section.academic_session_id == source_id,
+        Section.year < Course.duration_years,
+        ~exists().where(and_(
+            existing.academic_session_id == target_id,
+            existing.department_id == Section.department_id,
+            existing.name == Section.name,
+            existing.year == Section.year + 1
+        ))
+    )
+    result = db.session.execute(sections.insert().from_select(
+        ['name', 'year', 'department_id', 'academic_session_id'], source))
+    return result.rowcount
+
+
+def promote_students(job, batch_size=ROLLOVER_BATCH_SIZE):
+    """Moves students of the source session's sections to the matching section of the target session.
+
+    The match is the same department and section name, one year up; students
+    of final-year sections have no match and are left without a section.
+    Students are updated in batches with one correlated UPDATE each, and the
+    job's counts are committed with every batch. Students already moved are
+    no longer in a source section, so an interrupted job can simply be run
+    again.
+    """
+    source_sections = select(Section.id).where(Section.academic_session_id == job.source_session_id)
+    old = aliased(Section)
+    new = aliased(Section)
+    # min() keeps the subquery scalar even if the target has duplicate sections
+    next_section = select(func.min(new.id)).where(
+        old.id == User.section_id,
+        new.academic_session_id == job.target_session_id,
+        new.department_id == old.department_id,
+        new.name == old.name,
+        new.year == old.year + 1
+    ).scalar_subquery()
+
+    last_id = 0
+    while True:
+        user_ids = [row.id for row in db.session.query(User.id).filter(
+            User.section_id.in_(source_sections),
+            User.role.in_(ROLLED_OVER_ROLES),
+            User.id > last_id
+        ).order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            return
+
+        User.query.filter(User.id.in_(user_ids)).update(
+            {User.section_id: next_section}, synchronize_session=False)
+        graduated = User.query.filter(User.id.in_(user_ids), User.section_id.is_(None)).count()
+        job.students_promoted += len(user_ids) - graduated
+        job.students_graduated += graduated
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+        last_id = user_ids[-1]
+
+
+def run_rollover(job_id, batch_size=ROLLOVER_BATCH_SIZE):
+    job = db.session.get(SessionRollover, job_id)
+    job.status = 'running'
+    job.updated_at = datetime.utcnow()
+    job.students_total = User.query.filter(
+        User.section_id.in_(select(Section.id).where(Section.academic_session_id == job.source_session_id)),
+        User.role.in_(ROLLED_OVER_ROLES)
+    ).count() + job.students_promoted + job.students_graduated
+    db.session.commit()
+
+    try:
+        job.sections_created += clone_sections(job.source_session_id, job.target_session_id)
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        promote_students(job, batch_size)
+
+        if job.activate:
+            AcademicSession.query.filter(AcademicSession.id != job.target_session_id).update(
+                {AcademicSession.is_active: False}, synchronize_session=False)
+            target = job.target_session
+            if not target.is_active:
+                target.is_active = True
+                target.activated_at = datetime.utcnow()
+        job.status = 'done'
+        job.finished_at = job.updated_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(e)[:255]
+        job.finished_at = job.updated_at = datetime.utcnow()
+        db.session.commit()
+        print(f"Error in session rollover {job_id}: {e}")
+        return
+
+    # One audit entry for the whole rollover instead of one per section and student
+    log_activity('session_rollover', (
+        f"Session '{job.source_session.year_name}' rolled over to '{job.target_session.year_name}': "
+        f"{job.sections_created} sections created, {job.students_promoted} students promoted, "
+        f"{job.students_graduated} graduated."
+    )[:255], user_id=job.created_by)
+
+
+def start_rollover(app, job_id):
+    """Runs the rollover in a background thread of this worker; its progress is read back from the job row."""
+    def _run():
+        with app.app_context():
+            try:
+                run_rollover(job_id)
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=_run, name=f'session-rollover-{job_id}', daemon=True).start()
@@ -1,18 +1,40 @@
-from flask import request, jsonify, Blueprint
-from sqlalchemy.orm import joinedload
+from flask import request, jsonify, Blueprint, current_app, Response, redirect, send_file, g
+from sqlalchemy.orm import joinedload, selectinload
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from functools import wraps
+from werkzeug.datastructures import MultiDict
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, create_refresh_token, get_jwt, verify_jwt_in_request
 import secrets
 from datetime import date, datetime, timedelta
 from .email import send_password_reset_email
-from .utils import upload_file_to_firebase, delete_file_from_firebase
-from .models import User, Note, Log, Department, Course, AcademicSession, Section
+from .utils import delete_file_from_firebase, compute_file_hash
+from .file_store import acquire_file, acquire_files, release_file, store_preview, copy_derivatives
+from .models import User, Note, StoredFile, NoteCounter, NoteText, NoteSignature, NoteLshBucket, Log, Department, Course, AcademicSession, Section, note_sections
+from .models import ArchivedNote, ArchivedLog, archived_note_sections, SessionRollover, UserImport
 from .logger import log_activity
-from . import db
+from . import db, extractor, spool, file_cache, counters, replicas
 from .converters import convert_images_to_pdf
+from .cache import NamespacedCache
+from .autocomplete import PrefixIndex
+from .trigram import TrigramIndex
+from .fulltext import FullTextIndex
+from .similar import SimilarityIndex
+from .extraction import compress_pages, decompress_pages, count_pdf_pages, render_pdf_preview
+from .minhash import compute_signature, band_hashes, similarities
+from .bundles import stream_zip
+from .rollover import next_year_name, start_rollover
+from .user_import import roster_format, start_user_import
+from .replicas import primary_only
+from .db_pool import pool_status
+from . import trending
+import base64
+import os
+import tempfile
+import heapq
+import binascii
 import io
+import json
 
 # Create a Blueprint
 api = Blueprint('api', __name__)
@@ -20,12 +42,226 @@ api = Blueprint('api', __name__)
 # Define the allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
 
+# Upper bound on the number of notes a single batch request may ask for
+MAX_BATCH_NOTES = 100
+MAX_BATCH_UPLOAD_NOTES = 50
+MAX_ADMIN_BATCH_OPERATIONS = 1000
+
+# ZIP bundles: notes per bundle and files downloaded ahead of the one being streamed
+BUNDLE_MAX_NOTES = 200
+BUNDLE_PREFETCH = 4
+
+TRENDING_MAX_LIMIT = 50
+SIMILAR_MAX_LIMIT = 10
+
+# Proxied note files never change, so clients may keep them for a day
+FILE_PROXY_MAX_AGE = 24 * 60 * 60
+
+# Feed pages, keyed by the section and departments they were built from
+feed_cache = NamespacedCache(maxsize=2048, ttl=60)
+FEED_PAGE_SIZE = 10
+FEED_MAX_PAGE_SIZE = 50
+
+# Facet counts per filter set; any note write drops the whole 'notes' namespace
+facet_cache = NamespacedCache(maxsize=512, ttl=300)
+
+# Subjects, titles and usernames for search-as-you-type
+autocomplete_index = PrefixIndex()
+AUTOCOMPLETE_KINDS = ['subject', 'title', 'user']
+AUTOCOMPLETE_REBUILD_SECONDS = 300
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+# Typo-tolerant ?fuzzy=true search over note titles and subjects
+title_trigrams = TrigramIndex()
+subject_trigrams = TrigramIndex()
+FUZZY_REBUILD_SECONDS = 300
+FUZZY_MAX_CANDIDATES = 500
+FUZZY_THRESHOLD = 0.3
+
+# Words of the text extracted from uploaded PDFs, for ?content= search
+content_index = FullTextIndex()
+CONTENT_REBUILD_SECONDS = 3600
+CONTENT_MAX_MATCHES = 1000
+
+# TF-IDF "related notes", with each note's top-k neighbours precomputed
+similar_index = SimilarityIndex(k=10)
+SIMILAR_REBUILD_SECONDS = 3600
+# Extracted text beyond this many characters adds little to a note's vector
+SIMILAR_MAX_TEXT_CHARS = 20000
+
+# A running rollover whose job row has not moved for this long is taken to have died with its worker
+ROLLOVER_STALE_SECONDS = 10 * 60
+
+# Estimated Jaccard similarity above which two notes are flagged as near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_MAX_CANDIDATES = 200
+
 # Helper function to check if the file extension is allowed
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def note_cache_namespaces(note):
+    namespaces = [f"section:{section.id}" for section in note.sections]
+    if note.department_id:
+        namespaces.append(f"department:{note.department_id}")
+    return namespaces
+
+
+def invalidate_note_caches(namespaces):
+    feed_cache.invalidate(*namespaces)
+    facet_cache.invalidate('notes')
+
+
+def note_search_fields(note):
+    return {'id': note.id, 'title': note.title, 'subject': note.subject}
+
+
+def sync_note_indexes(before=None, after=None):
+    # before/after are note_search_fields() snapshots; None for uploads and deletes
+    for kind in ['title', 'subject']:
+        if before:
+            autocomplete_index.remove(kind, before[kind])
+        if after:
+            autocomplete_index.add(kind, after[kind])
+
+    for kind, trigram_index in [('title', title_trigrams), ('subject', subject_trigrams)]:
+        if after:
+            trigram_index.add(after['id'], after[kind])
+        elif before:
+            trigram_index.remove(before['id'])
+
+    # Extracted text only changes when the extraction job finishes, see store_note_text
+    if before and not after:
+        content_index.remove(before['id'])
+
+    if after:
+        refresh_similar_note(after['id'])
+    elif before:
+        similar_index.remove(before['id'])
+
+
+def load_autocomplete_terms():
+    for title, subject in db.session.query(Note.title, Note.subject):
+        yield 'title', title
+        yield 'subject', subject
+    for (username,) in db.session.query(User.username):
+        yield 'user', username
+
+
+def load_title_trigrams():
+    return db.session.query(Note.id, Note.title)
+
+
+def load_subject_trigrams():
+    return db.session.query(Note.id, Note.subject)
+
+
+def similarity_text(title, subject, description, content):
+    # Title and subject are repeated so they outweigh a long body of extracted text
+    text = ' '.join(decompress_pages(content))[:SIMILAR_MAX_TEXT_CHARS] if content else ''
+    return ' '.join([title, title, subject, subject, description or '', text])
+
+
+def load_similarity_texts():
+    query = db.session.query(Note.id, Note.title, Note.subject, Note.description, NoteText.content).outerjoin(
+        NoteText, NoteText.note_id == Note.id)
+    for note_id, title, subject, description, content in query.yield_per(500):
+        yield note_id, similarity_text(title, subject, description, content)
+
+
+def refresh_similar_note(note_id):
+    # Before the first rebuild starts there is nothing to update; it will load the note itself
+    if similar_index.built_at is None and not similar_index.rebuilding:
+        return
+    row = db.session.query(Note.title, Note.subject, Note.description, NoteText.content).outerjoin(
+        NoteText, NoteText.note_id == Note.id).filter(Note.id == note_id).first()
+    if row:
+        similar_index.add(note_id, similarity_text(*row))
+
+
+def load_note_texts():
+    for note_id, content in db.session.query(NoteText.note_id, NoteText.content).yield_per(500):
+        yield note_id, ' '.join(decompress_pages(content))
+
+
+def store_note_text(note_id, pages):
+    # Runs once the extraction process finishes; the note may be gone by then
+    if not db.session.get(Note, note_id):
+        return
+    db.session.merge(NoteText(note_id=note_id, page_count=len(pages), content=compress_pages(pages)))
+    db.session.commit()
+    content_index.add(note_id, ' '.join(pages))
+    store_note_signature(note_id, ' '.join(pages))
+    refresh_similar_note(note_id)
+
+
+def copy_note_text(file_url, note_id):
+    # A shared file has already been extracted for another note; reuse that text
+    source = NoteText.query.join(Note, Note.id == NoteText.note_id).filter(
+        Note.file_url == file_url,
+        Note.id != note_id
+    ).first()
+    if not source:
+        return False
+    text = ' '.join(decompress_pages(source.content))
+    db.session.add(NoteText(note_id=note_id, page_count=source.page_count, content=source.content))
+    db.session.commit()
+    content_index.add(note_id, text)
+    store_note_signature(note_id, text)
+    refresh_similar_note(note_id)
+    return True
+
+
+def store_note_signature(note_id, text):
+    signature = compute_signature(text)
+    if signature is None:
+        # Image-only PDFs have no text layer to sign
+        return
+
+    record = NoteSignature(note_id=note_id, signature=signature)
+    duplicates = find_near_duplicates(note_id, signature, limit=1)
+    if duplicates:
+        record.duplicate_of_id, record.duplicate_similarity = duplicates[0]
+
+    NoteLshBucket.query.filter_by(note_id=note_id).delete()
+    db.session.merge(record)
+    db.session.add_all(NoteLshBucket(band=band, bucket=bucket, note_id=note_id)
+                       for band, bucket in enumerate(band_hashes(signature)))
+    db.session.commit()
+    if duplicates:
+        print(f"Note ID {note_id} looks like a near-duplicate of note ID {duplicates[0][0]} ({duplicates[0][1]:.2f}).")
+
+
+def find_near_duplicates(note_id, signature, limit=10):
+    # LSH: only notes sharing at least one band bucket are compared, via the bucket primary key
+    buckets = band_hashes(signature)
+    candidate_ids = [row.note_id for row in db.session.query(NoteLshBucket.note_id).filter(
+        db.or_(*[db.and_(NoteLshBucket.band == band, NoteLshBucket.bucket == bucket) for band, bucket in enumerate(buckets)]),
+        NoteLshBucket.note_id != note_id
+    ).distinct().limit(NEAR_DUPLICATE_MAX_CANDIDATES)]
+    if not candidate_ids:
+        return []
+
+    rows = db.session.query(NoteSignature.note_id, NoteSignature.signature).filter(
+        NoteSignature.note_id.in_(candidate_ids)).all()
+    scores = similarities(signature, [row.signature for row in rows])
+    matches = [(row.note_id, float(score)) for row, score in zip(rows, scores) if score >= NEAR_DUPLICATE_THRESHOLD]
+    return sorted(matches, key=lambda match: (-match[1], match[0]))[:limit]
+
+
+def encode_feed_cursor(created_at, note_id):
+    raw = f"{created_at.isoformat()}|{note_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feed_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, note_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(note_id)
+
+
 def super_admin_required():
     def wrapper(fn):
         @wraps(fn)
@@ -89,6 +325,7 @@ def signup():
 
     db.session.add(new_user)
     db.session.commit()
+    autocomplete_index.add('user', new_user.username)
     log_activity('user_signup', f"New user '{new_user.username}' created with College ID '{college_id}'.")
 
     return jsonify({"message": "User created successfully!"}), 201
@@ -241,24 +478,13 @@ def upload_note():
         user = User.query.get(current_user_id)
         if not user:
             return jsonify({"error": "User not found in database"}), 401
-        user_role = user.role
     except (TypeError, ValueError):
         return jsonify({"error": "Invalid user identity in token"}), 401
 
     # --- 1. VALIDATE FORM DATA FIRST ---
-    title = request.form.get('title')
-    subject = request.form.get('subject')
-    semester_str = request.form.get('semester')
-    academic_year = request.form.get('academic_year')
-
-    # This validation is now correct, checking only the core fields
-    if not all([title, subject, semester_str, academic_year]):
-        return jsonify({"error": "Missing required form fields. Please fill out all entries."}), 400
-
-    try:
-        semester = int(semester_str)
-    except (ValueError, TypeError):
-        return jsonify({"error": "Semester must be a valid number."}), 400
+    fields, error = parse_note_fields(request.form)
+    if error:
+        return jsonify({"error": error}), 400
 
     # --- 2. VALIDATE FILES (if form data is ok) ---
     files = request.files.getlist('file')
@@ -266,64 +492,380 @@ def upload_note():
         return jsonify({"error": "No file selected"}), 400
     
     # --- 3. PROCESS AND UPLOAD FILES ---
-    final_file_to_upload = None
+    final_file_to_upload, original_filename, content_type, error = prepare_upload_file(files)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+
+    return store_uploaded_note(user, fields, final_file_to_upload, original_filename, content_type)
+
+
+def prepare_upload_file(files):
+    """Returns ``(file, filename, content_type, error)`` for one note's uploaded files.
+
+    A single PDF is used as-is and images are combined into one PDF;
+    ``error`` is a ``(message, status)`` pair when neither applies.
+    """
     original_filename = files[0].filename
     content_type = files[0].content_type
-    
+
     if len(files) == 1 and files[0].mimetype == 'application/pdf':
-        final_file_to_upload = files[0]
-    elif all(file.mimetype.startswith('image/') for file in files):
-        pdf_stream = convert_images_to_pdf(files)
+        return files[0], original_filename, content_type, None
+
+    if all(file.mimetype.startswith('image/') for file in files):
+        pdf_stream = convert_images_to_pdf(
+            files,
+            preprocess=current_app.config['IMAGE_PREPROCESSING'],
+            target_dpi=current_app.config['IMAGE_TARGET_DPI'],
+            color_mode=current_app.config['IMAGE_COLOR_MODE'],
+            jpeg_quality=current_app.config['IMAGE_JPEG_QUALITY']
+        )
         if not pdf_stream:
-            return jsonify({"error": "Failed to convert images to PDF."}), 500
-        final_file_to_upload = pdf_stream
-        original_filename = f"{original_filename.rsplit('.', 1)[0]}.pdf"
-        content_type = 'application/pdf'
-    else:
-        return jsonify({"error": "Invalid file combination. Please upload a single PDF or one or more images."}), 400
-    
+            return None, None, None, ("Failed to convert images to PDF.", 500)
+        return pdf_stream, f"{original_filename.rsplit('.', 1)[0]}.pdf", 'application/pdf', None
+
+    return None, None, None, ("Invalid file combination. Please upload a single PDF or one or more images.", 400)
+
+
+@api.route('/notes/upload/batch', methods=['POST'])
+@jwt_required()
+def upload_notes_batch():
+    """Creates many notes in one request.
+
+    Multipart body: ``items`` is a JSON list of note fields, each with a
+    ``file`` naming the form field that holds that note's PDF or images.
+    Storage uploads run concurrently and every note is inserted in a single
+    transaction; the response has one result per item, in order.
+    """
+    current_user_id = int(get_jwt_identity())
+    user = User.query.get(current_user_id)
+    if not user:
+        return jsonify({"error": "User not found in database"}), 401
+
     try:
-        file_url = upload_file_to_firebase(final_file_to_upload, original_filename, content_type)
-        if not file_url:
-            return jsonify({"error": "Failed to upload file to storage"}), 502
+        items = json.loads(request.form.get('items', ''))
+    except ValueError:
+        return jsonify({"error": "items must be a JSON list of note fields"}), 400
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        return jsonify({"error": "items must be a JSON list of note fields"}), 400
+    if len(items) > MAX_BATCH_UPLOAD_NOTES:
+        return jsonify({"error": f"At most {MAX_BATCH_UPLOAD_NOTES} notes can be uploaded at once"}), 400
+
+    results = [None] * len(items)
+    prepared = []
+    for index, item in enumerate(items):
+        fields, error = parse_note_fields(MultiDict(item))
+        files = request.files.getlist(str(item.get('file', '')))
+        if not error and (not files or files[0].filename == ''):
+            error = "No file selected"
+        if not error:
+            final_file, filename, content_type, file_error = prepare_upload_file(files)
+            error = file_error[0] if file_error else None
+        if error:
+            results[index] = {"index": index, "status": "error", "error": error}
+            continue
+        file_hash, file_size = compute_file_hash(final_file)
+        prepared.append((index, fields, final_file, filename, content_type, file_hash, file_size))
+
+    try:
+        acquired = acquire_files([(f, name, ctype, file_hash, size) for _, _, f, name, ctype, file_hash, size in prepared],
+                                 max_workers=current_app.config['UPLOAD_CONCURRENCY'])
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+    created = []
+    for (index, fields, final_file, _, _, file_hash, file_size), (file_url, reused_file) in zip(prepared, acquired):
+        if not file_url:
+            results[index] = {"index": index, "status": "error", "error": "Failed to upload file to storage"}
+            continue
+        try:
+            note = build_note(user, fields, file_url, file_size, count_pdf_pages(final_file))
+        except Exception as e:
+            print(f"Error building note {index} of batch upload: {e}")
+            discard_batch_files(acquired)
+            return jsonify({"error": "An internal server error occurred"}), 500
+        db.session.add(note)
+        created.append((index, note, final_file, file_hash, reused_file))
+
+    affected_namespaces = set()
+    for _, note, _, _, _ in created:
+        affected_namespaces.update(note_cache_namespaces(note))
+    try:
+        db.session.commit()
+    except Exception as e:
+        print(f"Error committing batch upload: {e}")
+        discard_batch_files(acquired)
+        return jsonify({"error": "An internal server error occurred"}), 500
+
+    invalidate_note_caches(affected_namespaces)
+    for index, note, final_file, file_hash, reused_file in created:
+        sync_note_indexes(after=note_search_fields(note))
+        final_file.seek(0)
+        process_note_file(note, file_hash, reused_file, final_file.read())
+        results[index] = {"index": index, "status": "created", "note_id": note.id, "file_url": note.file_url}
+
+    if created:
+        log_activity('note_upload', f"{len(created)} notes uploaded in a batch by user ID {current_user_id}.")
+    return jsonify({"results": results}), 201 if created else 400
+
+
+def discard_batch_files(acquired):
+    # Rolling back drops the StoredFile rows and references the batch added; only its new blobs are left to delete
+    db.session.rollback()
+    for file_url, reused_file in acquired:
+        if file_url and not reused_file:
+            delete_file_from_firebase(file_url)
+
+
+@api.route('/notes/uploads', methods=['POST'])
+@jwt_required()
+def init_chunked_upload():
+    """Starts a resumable upload of a single PDF; the body holds the file's size and the note fields."""
+    current_user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+
+    fields, error = parse_note_fields(MultiDict(data))
+    if error:
+        return jsonify({"error": error}), 400
+    filename = data.get('filename') or ''
+    if not filename.lower().endswith('.pdf'):
+        return jsonify({"error": "Chunked uploads must be a single PDF file."}), 400
+
+    try:
+        manifest = spool.create(current_user_id, filename, data.get('size'), data.get('sha256'), data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "upload_id": manifest['upload_id'],
+        "chunk_size": manifest['chunk_size'],
+        "total_chunks": manifest['total_chunks']
+    }), 201
+
+
+def get_own_upload(upload_id):
+    manifest = spool.get(upload_id)
+    if manifest and manifest['user_id'] == int(get_jwt_identity()):
+        return manifest
+    return None
+
+
+@api.route('/notes/uploads/<upload_id>', methods=['GET'])
+@jwt_required()
+def get_chunked_upload(upload_id):
+    # Lets a client that lost its connection find out which chunks still need sending
+    manifest = get_own_upload(upload_id)
+    if not manifest:
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify({
+        "upload_id": upload_id,
+        "size": manifest['size'],
+        "chunk_size": manifest['chunk_size'],
+        "total_chunks": manifest['total_chunks'],
+        "received": spool.received(manifest),
+        "note_id": spool.completed_note(manifest)
+    })
+
+
+@api.route('/notes/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@jwt_required()
+def put_upload_chunk(upload_id, index):
+    manifest = get_own_upload(upload_id)
+    if not manifest:
+        return jsonify({"error": "Upload not found"}), 404
+    if spool.is_claimed(manifest):
+        return jsonify({"error": "This upload has already been completed"}), 409
+
+    try:
+        spool.write_chunk(manifest, index, request.stream, request.headers.get('X-Chunk-Checksum'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"index": index, "received": len(spool.received(manifest))})
+
+
+@api.route('/notes/uploads/<upload_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_chunked_upload(upload_id):
+    manifest = get_own_upload(upload_id)
+    if not manifest:
+        return jsonify({"error": "Upload not found"}), 404
+    user = User.query.get(manifest['user_id'])
+    if not user:
+        return jsonify({"error": "User not found in database"}), 401
+
+    fields, error = parse_note_fields(MultiDict(manifest['fields']))
+    if error:
+        return jsonify({"error": error}), 400
+
+    # A retried or concurrent completion must not assemble the file again or create a second note
+    if not spool.claim(manifest):
+        note_id = spool.completed_note(manifest)
+        if note_id is None:
+            return jsonify({"error": "This upload is already being completed"}), 409
+        note = Note.query.get(note_id)
+        return jsonify({"message": "Note uploaded successfully!", "note_id": note_id,
+                        "file_url": note.file_url if note else None}), 200
+
+    try:
+        try:
+            path = spool.assemble(manifest)
+        except ValueError as e:
+            spool.release(manifest)
+            return jsonify({"error": str(e)}), 400
+
+        with open(path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                spool.discard(manifest)
+                return jsonify({"error": "The uploaded file is not a PDF."}), 400
+            # The background jobs read the assembled file from disk; it is removed once they finish
+            response, status = store_uploaded_note(user, fields, f, manifest['filename'], 'application/pdf',
+                                                   source=path, on_processed=lambda: spool.drop_data(manifest))
+    except Exception:
+        spool.release(manifest)
+        raise
+
+    if status == 201:
+        spool.finish(manifest, response.get_json()['note_id'])
+    else:
+        spool.release(manifest)
+    return response, status
+
+
+@api.route('/notes/uploads/<upload_id>', methods=['DELETE'])
+@jwt_required()
+def abort_chunked_upload(upload_id):
+    manifest = get_own_upload(upload_id)
+    if not manifest:
+        return jsonify({"error": "Upload not found"}), 404
+    if spool.is_claimed(manifest):
+        # Its background jobs may still be reading the assembled file
+        return jsonify({"error": "This upload has already been completed"}), 409
+    spool.discard(manifest)
+    return jsonify({"message": "Upload discarded"}), 200
+
+
+def parse_note_fields(form):
+    """Validates the metadata of a new note; returns ``(fields, error)``."""
+    title = form.get('title')
+    subject = form.get('subject')
+    semester_str = form.get('semester')
+    academic_year = form.get('academic_year')
+
+    # This validation is now correct, checking only the core fields
+    if not all([title, subject, semester_str, academic_year]):
+        return None, "Missing required form fields. Please fill out all entries."
+
+    try:
+        semester = int(semester_str)
+    except (ValueError, TypeError):
+        return None, "Semester must be a valid number."
+
+    # Checked here so a bad value is rejected before any file is stored
+    department_id = form.get('department_id')
+    if department_id in (None, ''):
+        department_id = None
+    else:
+        try:
+            department_id = int(department_id)
+        except (ValueError, TypeError):
+            return None, "Department must be a valid number."
+
+    return {
+        'title': title,
+        'subject': subject,
+        'semester': semester,
+        'academic_year': academic_year,
+        'department_id': department_id,
+        'section_ids': form.getlist('section_ids')
+    }, None
+
+
+def build_note(user, fields, file_url, file_size, page_count):
     new_note = Note(
-        title=title,
+        title=fields['title'],
         file_url=file_url,
-        subject=subject,
-        semester=semester,
-        academic_year=academic_year,
-        user_id=current_user_id,
-        is_verified=(user_role == 'professor')
+        file_size=file_size,
+        page_count=page_count,
+        subject=fields['subject'],
+        semester=fields['semester'],
+        academic_year=fields['academic_year'],
+        user_id=user.id,
+        is_verified=(user.role == 'professor'),
+        # A fresh upload starts with a small score so it can surface before anyone has opened it
+        trending_score=trending.event_score(trending.UPLOAD_WEIGHT, verified=(user.role == 'professor'))
     )
 
-    department_id = request.form.get('department_id')
-    section_ids = request.form.getlist('section_ids')
+    department_id = fields['department_id']
+    section_ids = fields['section_ids']
 
-    if user_role in ['student', 'moderator']:
+    if user.role in ['student', 'moderator']:
         if user.section:
             new_note.sections.append(user.section)
         new_note.department_id = user.department_id
 
-    elif user_role == 'professor':
+    elif user.role == 'professor':
         if department_id:
-            new_note.department_id = int(department_id)
+            new_note.department_id = department_id
 
-    elif user_role == 'super_admin':
+    elif user.role == 'super_admin':
         if department_id:
-            new_note.department_id = int(department_id)
+            new_note.department_id = department_id
         if section_ids:
             sections_to_add = Section.query.filter(Section.id.in_(section_ids)).all()
             for sec in sections_to_add:
                 new_note.sections.append(sec)
 
+    return new_note
+
+
+def store_uploaded_note(user, fields, final_file, original_filename, content_type, source=None, on_processed=None):
+    """Stores ``final_file``, creates its note and queues its background processing.
+
+    ``source`` is what the background jobs read, the PDF bytes by default
+    or a path on disk; ``on_processed`` is called once they are done with it.
+    """
+    file_hash, file_size = compute_file_hash(final_file)
+    page_count = count_pdf_pages(final_file)
+
+    try:
+        # Identical content uploaded before is shared instead of stored again
+        file_url, reused_file = acquire_file(final_file, original_filename, content_type,
+                                             file_hash=file_hash, size=file_size)
+        if not file_url:
+            return jsonify({"error": "Failed to upload file to storage"}), 502
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    new_note = build_note(user, fields, file_url, file_size, page_count)
     db.session.add(new_note)
+    affected_namespaces = note_cache_namespaces(new_note)
     db.session.commit()
-    
-    log_activity('note_upload', f"Note '{new_note.title}' uploaded by user ID {current_user_id}.")
-    return jsonify({"message": "Note uploaded successfully!", "file_url": file_url}), 201
+    invalidate_note_caches(affected_namespaces)
+    sync_note_indexes(after=note_search_fields(new_note))
+
+    if source is None:
+        final_file.seek(0)
+        source = final_file.read()
+    process_note_file(new_note, file_hash, reused_file, source, on_processed)
+
+    log_activity('note_upload', f"Note '{new_note.title}' uploaded by user ID {user.id}.")
+    return jsonify({"message": "Note uploaded successfully!", "note_id": new_note.id, "file_url": file_url}), 201
+
+
+def process_note_file(note, file_hash, reused_file, source, on_processed=None):
+    # Text and preview are copied from another note sharing the file when they already exist
+    app = current_app._get_current_object()
+    file_url = note.file_url
+    futures = []
+    if not (reused_file and copy_note_text(file_url, note.id)):
+        futures.append(extractor.submit(app, note.id, source, store_note_text))
+    if not (reused_file and copy_derivatives(file_url, note)):
+        futures.append(extractor.run(app, note.id, render_pdf_preview, (source,),
+                                     lambda note_id, preview: store_preview(file_url, file_hash, preview)))
+    if on_processed:
+        extractor.when_done(futures, on_processed)
 
 
 @api.route('/notes', methods=['GET'])
@@ -331,55 +873,430 @@ def get_notes():
     page = request.args.get('page', 1, type=int)
     per_page = 10
 
-    subject = request.args.get('subject')
-    academic_year = request.args.get('academic_year')
-    title = request.args.get('title')
-    verified_only = request.args.get('verified', 'false').lower() == 'true'
+    if request.args.get('fuzzy', 'false').lower() == 'true':
+        return fuzzy_search_notes(page, per_page)
 
-    query = Note.query
+    trending_sort = request.args.get('sort') == 'trending'
+    if include_archived():
+        return list_notes_with_archive(page, per_page, trending_sort)
 
-    if title:
-        query = query.filter(Note.title.ilike(f'%{title}%'))
-    if subject:
-        query = query.filter(Note.subject.ilike(f'%{subject}%'))
-    if academic_year:
-        query = query.filter(Note.academic_year.ilike(f'%{academic_year}%'))
-    if verified_only:
-        query = query.filter(Note.is_verified == True)
+    query = apply_note_filters(Note.query, request.args)
+    if trending_sort:
+        query = query.order_by(Note.trending_score.desc(), Note.id.desc())
+    else:
+        query = query.order_by(Note.created_at.desc())
 
-    pagination = query.order_by(Note.created_at.desc()).paginate(
+    pagination = query.paginate(
         page=page, per_page=per_page, error_out=False
     )
     notes = pagination.items
 
-    notes_list = []
-    for note in notes:
-        author_username = "Unknown"
-        if note.author:
-            author_username = note.author.username
-        
-        note_data = {
-            'id': note.id,
-            'title': note.title,
-            'description': note.description,
-            'file_url': note.file_url,
-            'subject': note.subject,
-            'semester': note.semester,
-            'academic_year': note.academic_year,
-            'created_at': note.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'author_username': author_username,
-            'author_id': note.user_id,
-            'is_verified': note.is_verified
-        }
-        notes_list.append(note_data)
+    notes_list = [serialize_note(note) for note in notes]
         
     return jsonify({
         'notes': notes_list,
         'total_pages': pagination.pages,
         'current_page': pagination.page,
-        'total_notes': pagination.total
+        'total_notes': pagination.total,
+        'content_truncated': g.get('content_truncated', False)
+    })
+
+
+def include_archived():
+    return request.args.get('include_archived', 'false').lower() == 'true'
+
+
+def list_notes_with_archive(page, per_page, trending_sort):
+    """A page of notes from the hot and archive tables together, for ?include_archived=true.
+
+    Each table is queried for its first ``page * per_page`` rows in the same
+    order and the two runs are merged, so the cost grows with the page
+    number; that is the price of the opt-in flag, not of ordinary listings.
+    """
+    runs = []
+    total = 0
+    for model, serialize in [(Note, serialize_note), (ArchivedNote, serialize_archived_note)]:
+        query = apply_note_filters(model.query, request.args, model=model)
+        total += query.order_by(None).count()
+        if trending_sort:
+            query = query.order_by(model.trending_score.desc(), model.id.desc())
+        else:
+            query = query.order_by(model.created_at.desc(), model.id.desc())
+        notes = query.options(joinedload(model.author)).limit(page * per_page).all()
+        runs.append([(note, serialize) for note in notes])
+
+    if trending_sort:
+        key = lambda item: (item[0].trending_score, item[0].id)
+    else:
+        key = lambda item: (item[0].created_at, item[0].id)
+    merged = list(heapq.merge(*runs, key=key, reverse=True))
+
+    return jsonify({
+        'notes': [serialize(note) for note, serialize in merged[(page - 1) * per_page:page * per_page]],
+        'total_pages': (total + per_page - 1) // per_page,
+        'current_page': page,
+        'total_notes': total,
+        'content_truncated': g.get('content_truncated', False)
+    })
+
+
+def apply_note_filters(query, args, text_filters=True, model=Note):
+    subject = args.get('subject') if text_filters else None
+    academic_year = args.get('academic_year')
+    title = args.get('title') if text_filters else None
+    semester = args.get('semester', type=int)
+    department_id = args.get('department_id', type=int)
+    content = args.get('content')
+    verified_only = args.get('verified', 'false').lower() == 'true'
+
+    if title:
+        query = query.filter(model.title.ilike(f'%{title}%'))
+    if subject:
+        query = query.filter(model.subject.ilike(f'%{subject}%'))
+    if academic_year:
+        query = query.filter(model.academic_year.ilike(f'%{academic_year}%'))
+    if semester:
+        query = query.filter(model.semester == semester)
+    if department_id:
+        query = query.filter(model.department_id == department_id)
+    if verified_only:
+        query = query.filter(model.is_verified == True)
+    if content:
+        # Last, so the other filters narrow the index matches before any cap applies
+        query = filter_by_content(query, content, model)
+
+    return query
+
+
+def filter_by_content(query, content, model=Note):
+    """Restricts ``query`` to notes whose extracted text contains every word of ``content``.
+
+    When the index matches more than ``CONTENT_MAX_MATCHES`` notes, the
+    matches are checked against the query's other filters in chunks, newest
+    first, with ``id IN (chunk)``, until that many pass; a broad term
+    combined with subject= or department_id= thus loses nothing, and only
+    the chunks needed are ever sent to the database. If more than the cap
+    pass, the newest are kept and ``g.content_truncated`` is set so listings
+    can say their totals are short. The index only covers hot notes, so
+    archived notes never match.
+    """
+    content_index.ensure_fresh(load_note_texts, CONTENT_REBUILD_SECONDS)
+    matches = content_index.search(content)
+    if len(matches) > CONTENT_MAX_MATCHES:
+        ids_query = query.with_entities(model.id).order_by(None)
+        kept = []
+        for start in range(0, len(matches), CONTENT_MAX_MATCHES):
+            chunk = matches[start:start + CONTENT_MAX_MATCHES]
+            allowed = {row[0] for row in ids_query.filter(model.id.in_(chunk))}
+            kept.extend(note_id for note_id in chunk if note_id in allowed)
+            if len(kept) > CONTENT_MAX_MATCHES:
+                kept = kept[:CONTENT_MAX_MATCHES]
+                g.content_truncated = True
+                break
+        matches = kept
+    return query.filter(model.id.in_(matches))
+
+
+def fuzzy_search_notes(page, per_page):
+    scores = None
+    for field, trigram_index, load_items in [('title', title_trigrams, load_title_trigrams),
+                                             ('subject', subject_trigrams, load_subject_trigrams)]:
+        text = request.args.get(field)
+        if not text:
+            continue
+
+        trigram_index.ensure_fresh(load_items, FUZZY_REBUILD_SECONDS)
+        matches = dict(trigram_index.search(text, limit=FUZZY_MAX_CANDIDATES, threshold=FUZZY_THRESHOLD))
+        # A note has to match every field that was searched; its score is the mean similarity
+        if scores is None:
+            scores = matches
+        else:
+            scores = {note_id: (scores[note_id] + score) / 2 for note_id, score in matches.items() if note_id in scores}
+
+    if scores is None:
+        return jsonify({"error": "Fuzzy search needs a title or subject"}), 400
+
+    notes = []
+    if scores:
+        query = apply_note_filters(Note.query, request.args, text_filters=False)
+        notes = query.options(joinedload(Note.author)).filter(Note.id.in_(list(scores))).all()
+    notes.sort(key=lambda note: (scores[note.id], note.created_at), reverse=True)
+
+    total = len(notes)
+    page_notes = notes[(page - 1) * per_page:page * per_page]
+    notes_list = [{**serialize_note(note), 'score': round(scores[note.id], 3)} for note in page_notes]
+
+    return jsonify({
+        'notes': notes_list,
+        'total_pages': (total + per_page - 1) // per_page,
+        'current_page': page,
+        'total_notes': total,
+        'content_truncated': g.get('content_truncated', False)
     })
 
+
+def serialize_note(note):
+    return {
+        'id': note.id,
+        'title': note.title,
+        'description': note.description,
+        'file_url': note.file_url,
+        'file_size': note.file_size,
+        'page_count': note.page_count,
+        'preview_url': note.preview_url,
+        'subject': note.subject,
+        'semester': note.semester,
+        'academic_year': note.academic_year,
+        'created_at': note.created_at,
+        'author_username': note.author.username if note.author else "Unknown",
+        'author_id': note.user_id,
+        'is_verified': note.is_verified,
+        'views': note.counter.views if note.counter else 0,
+        'downloads': note.counter.downloads if note.counter else 0
+    }
+
+
+def serialize_archived_note(note):
+    # Counts were folded into the archived row when the note was archived
+    return {
+        'id': note.id,
+        'title': note.title,
+        'description': note.description,
+        'file_url': note.file_url,
+        'file_size': note.file_size,
+        'page_count': note.page_count,
+        'preview_url': note.preview_url,
+        'subject': note.subject,
+        'semester': note.semester,
+        'academic_year': note.academic_year,
+        'created_at': note.created_at,
+        'author_username': note.author.username if note.author else "Unknown",
+        'author_id': note.user_id,
+        'is_verified': note.is_verified,
+        'views': note.views,
+        'downloads': note.downloads,
+        'archived': True
+    }
+
+
+@api.route('/notes/<int:note_id>/file', methods=['GET'])
+def get_note_file(note_id):
+    """Counts a download and serves the note's PDF from the local file cache, with Range requests and a strong ETag.
+
+    Redirects to storage when FILE_PROXY_ENABLED is off or the file cannot be fetched.
+    """
+    note = db.session.query(Note.file_url, Note.title, StoredFile.file_hash).outerjoin(
+        StoredFile, StoredFile.file_url == Note.file_url
+    ).filter(Note.id == note_id).first()
+    archived = False
+    if not note and include_archived():
+        note = db.session.query(ArchivedNote.file_url, ArchivedNote.title, StoredFile.file_hash).outerjoin(
+            StoredFile, StoredFile.file_url == ArchivedNote.file_url
+        ).filter(ArchivedNote.id == note_id).first()
+        archived = True
+    if not note:
+        return jsonify({"error": "Note not found"}), 404
+
+    key = file_cache.key_for(note.file_url, note.file_hash)
+    if request.if_none_match.contains(key):
+        # The key identifies the content, so a matching ETag needs no cache lookup at all
+        return Response(status=304, headers={'ETag': f'"{key}"'})
+
+    # Follow-up Range requests of a download already counted are not counted again
+    # Archived notes have no counter row left to add to
+    if not archived and (not request.range or request.range.ranges[0][0] == 0):
+        counters.record(current_app._get_current_object(), note_id, 'downloads')
+    if not current_app.config['FILE_PROXY_ENABLED']:
+        return redirect(note.file_url)
+
+    # A second attempt covers the file being evicted by another request between get() and send_file opening it
+    for _ in range(2):
+        path = file_cache.get(current_app.config['FILE_CACHE_DIR'], current_app.config['FILE_CACHE_MAX_BYTES'],
+                              key, note.file_url)
+        if not path:
+            return redirect(note.file_url)
+        try:
+            # send_file answers Range and If-Range itself and hands the file to the server's sendfile
+            response = send_file(path, mimetype='application/pdf', conditional=True, etag=key,
+                                 download_name=f"{secure_filename(note.title) or 'note'}.pdf",
+                                 max_age=FILE_PROXY_MAX_AGE)
+        except FileNotFoundError:
+            continue
+        file_cache.count_served(response.content_length)
+        return response
+    return redirect(note.file_url)
+
+
+@api.route('/notes/trending', methods=['GET'])
+def get_trending_notes():
+    """Top notes by time-decayed engagement, optionally within one department and/or exact subject.
+
+    Scores are kept up to date as events are flushed (see trending.py), so
+    this is an index range scan that reads only ``limit`` rows.
+    """
+    limit = min(max(request.args.get('limit', 10, type=int), 1), TRENDING_MAX_LIMIT)
+    department_id = request.args.get('department_id', type=int)
+    subject = request.args.get('subject')
+
+    query = Note.query.options(joinedload(Note.author))
+    if department_id:
+        query = query.filter(Note.department_id == department_id)
+    if subject:
+        query = query.filter(Note.subject == subject)
+    notes = query.order_by(Note.trending_score.desc()).limit(limit).all()
+
+    now = datetime.utcnow()
+    return jsonify({
+        'notes': [dict(serialize_note(note), trending_score=round(trending.decayed(note.trending_score, now), 3))
+                  for note in notes]
+    })
+
+
+@api.route('/notes/bundle', methods=['GET'])
+@jwt_required()
+def download_notes_bundle():
+    """Streams a ZIP of every note matching the filters; a subject is required."""
+    if not request.args.get('subject'):
+        return jsonify({"error": "subject is required"}), 400
+
+    query = apply_note_filters(Note.query, request.args).with_entities(
+        Note.id, Note.title, Note.file_url, Note.created_at)
+    notes = query.order_by(Note.created_at.desc()).limit(BUNDLE_MAX_NOTES + 1).all()
+    if not notes:
+        return jsonify({"error": "No notes match these filters"}), 404
+    if len(notes) > BUNDLE_MAX_NOTES:
+        return jsonify({"error": f"Bundles are limited to {BUNDLE_MAX_NOTES} notes; narrow the filters"}), 400
+
+    # Read everything from the database now; the response is produced after the request context is gone
+    entries = [
+        (f"{secure_filename(note.title) or 'note'}-{note.id}.pdf", note.file_url, note.created_at.timetuple()[:6])
+        for note in notes
+    ]
+    bundle_name = secure_filename('-'.join(filter(None, [
+        request.args.get('subject'), request.args.get('semester') and f"sem{request.args.get('semester')}"
+    ]))) or 'notes'
+
+    return Response(
+        stream_zip(entries, prefetch=BUNDLE_PREFETCH),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{bundle_name}.zip"'}
+    )
+
+
+@api.route('/notes/facets', methods=['GET'])
+def get_note_facets():
+    filter_keys = ['title', 'subject', 'content', 'academic_year', 'semester', 'department_id', 'verified']
+    cache_key = tuple((key, request.args.get(key, '').lower()) for key in filter_keys)
+
+    cached = facet_cache.get(['notes'], cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
+    def counts(*columns):
+        query = apply_note_filters(db.session.query(*columns, db.func.count(Note.id)), request.args)
+        if Department.name in columns:
+            query = query.outerjoin(Department, Note.department_id == Department.id)
+        return query.group_by(*columns).order_by(db.func.count(Note.id).desc(), columns[0]).all()
+
+    facets = {
+        'subject': [{'value': value, 'count': count} for value, count in counts(Note.subject)],
+        'semester': [{'value': value, 'count': count} for value, count in counts(Note.semester)],
+        'academic_year': [{'value': value, 'count': count} for value, count in counts(Note.academic_year)],
+        'department_id': [
+            {'value': value, 'name': name, 'count': count}
+            for value, name, count in counts(Note.department_id, Department.name)
+        ]
+    }
+    facets['content_truncated'] = g.get('content_truncated', False)
+    facet_cache.set(['notes'], cache_key, facets)
+    return jsonify(facets)
+
+
+@api.route('/notes/autocomplete', methods=['GET'])
+def autocomplete_notes():
+    prefix = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 10, type=int), AUTOCOMPLETE_MAX_LIMIT))
+
+    kinds = request.args.get('kind')
+    kinds = [kind for kind in kinds.split(',') if kind in AUTOCOMPLETE_KINDS] if kinds else None
+
+    # Built on the first lookup in each worker, then refreshed periodically
+    autocomplete_index.ensure_fresh(load_autocomplete_terms, AUTOCOMPLETE_REBUILD_SECONDS)
+
+    return jsonify({'suggestions': autocomplete_index.lookup(prefix, limit=limit, kinds=kinds)})
+
+
+@api.route('/notes/feed', methods=['GET'])
+@jwt_required()
+def get_note_feed():
+    current_user_id = int(get_jwt_identity())
+    user = User.query.options(joinedload(User.departments_taught)).get(current_user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    limit = request.args.get('limit', FEED_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, FEED_MAX_PAGE_SIZE))
+
+    cursor = request.args.get('cursor')
+    try:
+        after = decode_feed_cursor(cursor) if cursor else None
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return jsonify({"error": "Invalid feed cursor"}), 400
+
+    # Professors follow every department they teach as well as their own
+    department_ids = {dept.id for dept in user.departments_taught}
+    if user.department_id:
+        department_ids.add(user.department_id)
+    department_ids = sorted(department_ids)
+
+    namespaces = [f"department:{dept_id}" for dept_id in department_ids]
+    if user.section_id:
+        namespaces.append(f"section:{user.section_id}")
+    if not namespaces:
+        return jsonify({'notes': [], 'next_cursor': None})
+
+    cache_key = (user.section_id, tuple(department_ids), cursor, limit)
+    cached = feed_cache.get(namespaces, cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
+    def newest_first(query):
+        # Keyset pagination on (created_at, id) so deep pages cost the same as the first
+        if after:
+            query = query.filter(db.or_(
+                Note.created_at < after[0],
+                db.and_(Note.created_at == after[0], Note.id < after[1])
+            ))
+        rows = query.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit + 1).all()
+        return [(row.created_at, row.id) for row in rows]
+
+    # Each branch is served by its own composite index; the union happens here
+    candidates = set()
+    if user.section_id:
+        candidates.update(newest_first(
+            db.session.query(Note.created_at, Note.id)
+            .join(note_sections, note_sections.c.note_id == Note.id)
+            .filter(note_sections.c.section_id == user.section_id)
+        ))
+    if department_ids:
+        candidates.update(newest_first(
+            db.session.query(Note.created_at, Note.id).filter(Note.department_id.in_(department_ids))
+        ))
+
+    page_keys = sorted(candidates, reverse=True)[:limit + 1]
+    has_more = len(page_keys) > limit
+    page_keys = page_keys[:limit]
+
+    notes = Note.query.options(joinedload(Note.author)).filter(Note.id.in_([note_id for _, note_id in page_keys])).all()
+    notes_by_id = {note.id: note for note in notes}
+
+    feed = {
+        'notes': [serialize_note(notes_by_id[note_id]) for _, note_id in page_keys if note_id in notes_by_id],
+        'next_cursor': encode_feed_cursor(*page_keys[-1]) if has_more else None
+    }
+    feed_cache.set(namespaces, cache_key, feed)
+    return jsonify(feed)
+
 @api.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
@@ -417,11 +1334,28 @@ def get_my_notes():
             'subject': note.subject,
             'semester': note.semester,
             'academic_year': note.academic_year,
-            'created_at': note.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'created_at': note.created_at,
             'author_id': note.user_id,
             'is_verified': note.is_verified
         }
         notes_list.append(note_data)
+
+    if include_archived():
+        archived_notes = ArchivedNote.query.filter_by(user_id=current_user_id).order_by(
+            ArchivedNote.created_at.desc()).all()
+        notes_list.extend({
+            'id': note.id,
+            'title': note.title,
+            'description': note.description,
+            'file_url': note.file_url,
+            'subject': note.subject,
+            'semester': note.semester,
+            'academic_year': note.academic_year,
+            'created_at': note.created_at,
+            'author_id': note.user_id,
+            'is_verified': note.is_verified,
+            'archived': True
+        } for note in archived_notes)
         
     return jsonify(notes_list)
 
@@ -440,9 +1374,22 @@ def delete_note(note_id):
         return jsonify({"error": "Forbidden: You do not have permission to delete this note"}), 403
 
     try:
-        delete_file_from_firebase(note.file_url)
+        file_url = note.file_url
+        preview_url = note.preview_url
+        blob_orphaned = release_file(file_url)
+        affected_namespaces = note_cache_namespaces(note)
+        search_fields = note_search_fields(note)
+        NoteSignature.query.filter_by(duplicate_of_id=note.id).update(
+            {NoteSignature.duplicate_of_id: None, NoteSignature.duplicate_similarity: None})
         db.session.delete(note)
         db.session.commit()
+        # Only once the commit has succeeded, and only if no other note shares the file
+        if blob_orphaned:
+            delete_file_from_firebase(file_url)
+            if preview_url:
+                delete_file_from_firebase(preview_url)
+        invalidate_note_caches(affected_namespaces)
+        sync_note_indexes(before=search_fields)
         log_activity('note_delete', f"Note ID {note_id} deleted by user ID {current_user_id}.")
         return jsonify({"message": "Note deleted successfully"}), 200
     
@@ -458,7 +1405,7 @@ def update_note(note_id):
     current_user_id = int(get_jwt_identity())
     current_user = User.query.get(current_user_id)
     
-    note = Note.query.get(note_id)
+    note = Note.query.options(*note_details_options()).get(note_id)
     if not note:
         return jsonify({"error": "Note not found"}), 404
 
@@ -469,6 +1416,10 @@ def update_note(note_id):
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
+    # Feeds that showed the note before the edit must be refreshed too
+    affected_namespaces = note_cache_namespaces(note)
+    search_fields_before = note_search_fields(note)
+
     note.title = data.get('title', note.title)
     note.subject = data.get('subject', note.subject)
     note.semester = data.get('semester', note.semester)
@@ -476,56 +1427,194 @@ def update_note(note_id):
 
     if current_user.role in ['professor', 'super_admin']:
         department_id = data.get('department_id')
-        note.department_id = int(department_id) if department_id else None
+        # Assign the relationship, not just the FK, so the response below sees it
+        note.department = db.session.get(Department, int(department_id)) if department_id else None
 
     if current_user.role == 'super_admin':
         section_ids = data.get('section_ids', [])
         note.sections.clear()
         if section_ids:
-            sections_to_add = Section.query.filter(Section.id.in_(section_ids)).all()
+            sections_to_add = Section.query.options(joinedload(Section.department)).filter(Section.id.in_(section_ids)).all()
             for sec in sections_to_add:
                 note.sections.append(sec)
 
+    # Flush so department_id follows the relationship, then build the response from the
+    # in-memory note; after commit it would be expired and reloaded
+    db.session.flush()
+    updated_note_data = serialize_note_details(note)
+    affected_namespaces += note_cache_namespaces(note)
+    search_fields_after = note_search_fields(note)
     db.session.commit()
+    invalidate_note_caches(affected_namespaces)
+    sync_note_indexes(before=search_fields_before, after=search_fields_after)
 
-    updated_note_response = get_note_details(note_id)
-    updated_note_data = updated_note_response.get_json()
     return jsonify({
         "message": "Note updated successfully",
         "note": updated_note_data
     }), 200
 
 
-@api.route('/notes/<int:note_id>', methods=['GET'])
-def get_note_details(note_id):
-    note = Note.query.options(
-        joinedload(Note.author),
-        joinedload(Note.department),
-        joinedload(Note.sections)
-    ).get(note_id)
+def note_details_options(loader=joinedload):
+    # joinedload suits a single note; batches use selectinload to avoid a row explosion
+    return (
+        loader(Note.author),
+        loader(Note.department),
+        loader(Note.sections).joinedload(Section.department),
+        loader(Note.signature),
+        loader(Note.counter)
+    )
 
-    if not note:
-        return jsonify({"error": "Note not found"}), 404
 
+def serialize_note_details(note):
     section_info = [{'id': s.id, 'code': s.section_code} for s in note.sections]
 
-    note_data = {
+    return {
         'id': note.id,
         'title': note.title,
         'description': note.description,
         'file_url': note.file_url,
+        'file_size': note.file_size,
+        'page_count': note.page_count,
+        'preview_url': note.preview_url,
         'subject': note.subject,
         'semester': note.semester,
         'academic_year': note.academic_year,
-        'created_at': note.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'created_at': note.created_at,
         'author_username': note.author.username if note.author else 'Unknown',
         'author_id': note.user_id,
         'is_verified': note.is_verified,
         'department_name': note.department.name if note.department else None,
         'department_id': note.department_id,
-        'sections': section_info
+        'sections': section_info,
+        'possible_duplicate_of': note.signature.duplicate_of_id if note.signature else None,
+        'views': note.counter.views if note.counter else 0,
+        'downloads': note.counter.downloads if note.counter else 0
+    }
+
+
+def serialize_archived_note_details(note):
+    return {
+        **serialize_archived_note(note),
+        'department_name': note.department.name if note.department else None,
+        'department_id': note.department_id,
+        'sections': [{'id': s.id, 'code': s.section_code} for s in note.sections],
+        'possible_duplicate_of': None,
+        'archived_at': note.archived_at
     }
-    return jsonify(note_data)
+
+
+@api.route('/notes/batch', methods=['GET'])
+def get_notes_batch():
+    # Accepts ?ids=1,2,3 as well as repeated ?ids=1&ids=2
+    try:
+        note_ids = [int(i) for param in request.args.getlist('ids') for i in param.split(',') if i.strip()]
+    except ValueError:
+        return jsonify({"error": "ids must be a comma-separated list of note IDs"}), 400
+
+    note_ids = list(dict.fromkeys(note_ids))
+    if not note_ids:
+        return jsonify({"error": "At least one note ID is required"}), 400
+    if len(note_ids) > MAX_BATCH_NOTES:
+        return jsonify({"error": f"A maximum of {MAX_BATCH_NOTES} notes can be requested at once"}), 400
+
+    # One query for the notes plus one per relationship, regardless of batch size
+    notes = Note.query.options(*note_details_options(selectinload)).filter(Note.id.in_(note_ids)).all()
+    notes_by_id = {note.id: note for note in notes}
+
+    return jsonify({
+        'notes': [serialize_note_details(notes_by_id[i]) for i in note_ids if i in notes_by_id],
+        'missing_ids': [i for i in note_ids if i not in notes_by_id]
+    })
+
+
+@api.route('/notes/<int:note_id>/similar', methods=['GET'])
+def get_similar_notes(note_id):
+    """Related notes by TF-IDF cosine similarity of title, subject, description and extracted text."""
+    limit = min(max(request.args.get('limit', 5, type=int), 1), SIMILAR_MAX_LIMIT)
+    if not db.session.get(Note, note_id):
+        return jsonify({"error": "Note not found"}), 404
+
+    # Building takes seconds on a large corpus; until the first build is done there are no results
+    similar_index.ensure_fresh_in_background(current_app._get_current_object(), load_similarity_texts,
+                                             SIMILAR_REBUILD_SECONDS)
+    neighbors = similar_index.similar(note_id, limit=limit)
+    notes_by_id = {note.id: note for note in Note.query.options(joinedload(Note.author)).filter(
+        Note.id.in_([other_id for other_id, _ in neighbors]))}
+
+    return jsonify({
+        'note_id': note_id,
+        'index_ready': similar_index.built_at is not None,
+        'similar': [dict(serialize_note(notes_by_id[other_id]), similarity=round(score, 3))
+                    for other_id, score in neighbors if other_id in notes_by_id]
+    })
+
+
+@api.route('/notes/<int:note_id>/duplicates', methods=['GET'])
+def get_note_duplicates(note_id):
+    note = Note.query.options(joinedload(Note.signature)).get(note_id)
+    if not note:
+        return jsonify({"error": "Note not found"}), 404
+    if not note.signature:
+        return jsonify({'note_id': note_id, 'signature_available': False, 'duplicates': []})
+
+    matches = find_near_duplicates(note_id, note.signature.signature)
+    notes_by_id = {n.id: n for n in Note.query.options(joinedload(Note.author)).filter(
+        Note.id.in_([match_id for match_id, _ in matches])).all()}
+
+    return jsonify({
+        'note_id': note_id,
+        'signature_available': True,
+        'duplicates': [
+            {**serialize_note(notes_by_id[match_id]), 'similarity': round(score, 3)}
+            for match_id, score in matches if match_id in notes_by_id
+        ]
+    })
+
+
+@api.route('/notes/duplicates', methods=['GET'])
+@jwt_required()
+def get_flagged_duplicates():
+    if get_jwt().get('role') not in ['moderator', 'super_admin']:
+        return jsonify({"error": "Moderator access required"}), 403
+
+    page = request.args.get('page', 1, type=int)
+    pagination = NoteSignature.query.options(
+        joinedload(NoteSignature.note).joinedload(Note.author),
+        joinedload(NoteSignature.duplicate_of).joinedload(Note.author)
+    ).filter(NoteSignature.duplicate_of_id.isnot(None)).order_by(NoteSignature.note_id.desc()).paginate(
+        page=page, per_page=20, error_out=False
+    )
+
+    return jsonify({
+        'flagged': [{
+            'note': serialize_note(record.note),
+            'duplicate_of': serialize_note(record.duplicate_of),
+            'similarity': round(record.duplicate_similarity, 3)
+        } for record in pagination.items],
+        'total_pages': pagination.pages,
+        'current_page': pagination.page,
+        'total_flagged': pagination.total
+    })
+
+
+@api.route('/notes/<int:note_id>', methods=['GET'])
+def get_note_details(note_id):
+    note = Note.query.options(*note_details_options()).get(note_id)
+
+    if not note and include_archived():
+        archived_note = ArchivedNote.query.options(
+            joinedload(ArchivedNote.author),
+            joinedload(ArchivedNote.department),
+            joinedload(ArchivedNote.sections).joinedload(Section.department)
+        ).get(note_id)
+        if archived_note:
+            return jsonify(serialize_archived_note_details(archived_note))
+
+    if not note:
+        return jsonify({"error": "Note not found"}), 404
+
+    counters.record(current_app._get_current_object(), note_id, 'views')
+    return jsonify(serialize_note_details(note))
 
 
 @api.route('/admin/users', methods=['GET'])
@@ -562,6 +1651,66 @@ def get_all_users():
 
     return jsonify(users_list)
 
+@api.route('/admin/users/import', methods=['POST'])
+@super_admin_required()
+def import_users():
+    """Starts a background import of a CSV or NDJSON roster (multipart field 'file').
+
+    Optional form fields: format (csv or ndjson, defaults to the file
+    extension) and dry_run=true to only validate. Returns the job, whose
+    progress and per-row error report GET /admin/users/imports/<id> shows.
+    """
+    roster = request.files.get('file')
+    if not roster or not roster.filename:
+        return jsonify(error="A roster file is required."), 400
+    fmt = roster_format(roster.filename, request.form.get('format'))
+    if not fmt:
+        return jsonify(error="Roster must be a .csv or .ndjson file."), 400
+
+    # The request stream is gone once we return, so the roster is spooled to disk for the job
+    fd, path = tempfile.mkstemp(prefix='notehub-roster-', suffix=f'.{fmt}')
+    with os.fdopen(fd, 'wb') as f:
+        roster.save(f)
+
+    job = UserImport(
+        filename=secure_filename(roster.filename) or 'roster',
+        dry_run=request.form.get('dry_run', 'false').lower() == 'true',
+        created_by=int(get_jwt_identity())
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    def _index_users(usernames):
+        for username in usernames:
+            autocomplete_index.add('user', username)
+
+    start_user_import(current_app._get_current_object(), job.id, path, fmt, on_created=_index_users)
+    return jsonify(serialize_user_import(job)), 202
+
+@api.route('/admin/users/imports/<int:job_id>', methods=['GET'])
+@primary_only
+@super_admin_required()
+def get_user_import(job_id):
+    job = UserImport.query.get_or_404(job_id)
+    return jsonify(serialize_user_import(job, errors=True))
+
+def serialize_user_import(job, errors=False):
+    data = {
+        'id': job.id,
+        'filename': job.filename,
+        'dry_run': job.dry_run,
+        'status': job.status,
+        'rows_done': job.rows_done,
+        'created': job.created_count,
+        'failed': job.failed_count,
+        'random_passwords': job.random_passwords,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at
+    }
+    if errors:
+        data['errors'] = json.loads(job.errors) if job.errors else []
+    return data
+
 @api.route('/admin/users/<int:user_id>/role', methods=['PUT'])
 @super_admin_required()
 def update_user_role(user_id):
@@ -584,6 +1733,26 @@ def update_user_role(user_id):
     log_activity('admin_role_change', f"User '{user.username}' role changed to '{new_role}'.")
     return jsonify(message=f"User {user.username}'s role updated to {new_role}")
 
+@api.route('/health/db', methods=['GET'])
+def database_health():
+    """Pings every database and reports its connection pool, as seen by the worker that answers."""
+    healthy = True
+    databases = {}
+    for bind, engine in db.engines.items():
+        error = None
+        try:
+            with engine.connect() as conn:
+                conn.execute(db.text('SELECT 1'))
+        except Exception as e:
+            healthy = False
+            error = str(e)[:255]
+        status = pool_status(engine)
+        status['ok'] = error is None
+        if error:
+            status['error'] = error
+        databases[bind or 'primary'] = status
+    return jsonify(status='ok' if healthy else 'error', databases=databases), 200 if healthy else 503
+
 @api.route('/admin/stats', methods=['GET'])
 @super_admin_required()
 def get_admin_stats():
@@ -598,12 +1767,34 @@ def get_admin_stats():
     recent_notes = Note.query.options(joinedload(Note.author)).order_by(Note.created_at.desc()).limit(5).all()
     recent_notes_list = [{'id': n.id, 'title': n.title, 'author': n.author.username if n.author else 'Unknown'} for n in recent_notes]
 
-    return jsonify({
+    stats = {
         'total_users': total_users,
         'total_notes': total_notes,
         'recent_users': recent_users_list,
         'recent_notes': recent_notes_list
-    })
+    }
+    # Flushed totals only; each worker may still hold up to COUNTER_FLUSH_SECONDS of events
+    total_views, total_downloads = db.session.query(
+        db.func.coalesce(db.func.sum(NoteCounter.views), 0),
+        db.func.coalesce(db.func.sum(NoteCounter.downloads), 0)
+    ).one()
+    most_viewed = db.session.query(Note.id, Note.title, NoteCounter.views, NoteCounter.downloads).join(
+        NoteCounter, NoteCounter.note_id == Note.id
+    ).order_by(NoteCounter.views.desc()).limit(5).all()
+    stats['total_views'] = int(total_views)
+    stats['total_downloads'] = int(total_downloads)
+    stats['most_viewed_notes'] = [
+        {'id': n.id, 'title': n.title, 'views': n.views, 'downloads': n.downloads} for n in most_viewed
+    ]
+    stats['counters'] = dict(counters.stats, pending_notes=counters.pending())
+    if 'replica' in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        # Routing counters and replica lag as seen by the worker that answered this request
+        stats['replica'] = replicas.snapshot(current_app)
+
+    if current_app.config['FILE_PROXY_ENABLED']:
+        # Counters of the worker that answered this request
+        stats['file_cache'] = file_cache.snapshot(current_app.config['FILE_CACHE_DIR'])
+    return jsonify(stats)
 
 @api.route('/admin/logs', methods=['GET'])
 @super_admin_required()
@@ -612,26 +1803,30 @@ def get_activity_logs():
     day_str = request.args.get('day')
     action_filter = request.args.get('action')
 
-    query = Log.query
-    
+    log_date = None
     if day_str:
         try:
             # Filter logs to a specific day
             log_date = date.fromisoformat(day_str)
-            query = query.filter(db.func.date(Log.timestamp) == log_date)
         except (ValueError, TypeError):
             return jsonify(error="Invalid date format. Use YYYY-MM-DD."), 400
 
-    if action_filter:
-            query = query.filter(Log.action == action_filter)
-
-    logs = query.order_by(Log.timestamp.desc()).all()
+    logs = []
+    for model in ([Log, ArchivedLog] if include_archived() else [Log]):
+        query = model.query.options(joinedload(model.user))
+        if log_date:
+            query = query.filter(db.func.date(model.timestamp) == log_date)
+        if action_filter:
+            query = query.filter(model.action == action_filter)
+        logs.extend(query.order_by(model.timestamp.desc()).all())
+    # Archived logs are all older than the hot ones, but a day filter can straddle the two
+    logs.sort(key=lambda log: log.timestamp, reverse=True)
 
     logs_list = []
     for log in logs:
         logs_list.append({
             'id': log.id,
-            'timestamp': log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': log.timestamp,
             'username': log.user.username if log.user else 'System',
             'action': log.action,
             'details': log.details
@@ -754,6 +1949,8 @@ def delete_department(dept_id):
     # Prevent deleting a department if it has students, professors, or notes
     if department.students or department.professors.first() or department.notes:
         return jsonify(error="Cannot delete department with associated users or notes."), 409
+    if ArchivedNote.query.filter_by(department_id=dept_id).first():
+        return jsonify(error="Cannot delete department with archived notes."), 409
 
     db.session.delete(department)
     db.session.commit()
@@ -793,19 +1990,141 @@ def assign_professor_departments(user_id):
     data = request.get_json()
     department_ids = data.get('department_ids', [])
 
-    # Clear existing departments
-    user.departments_taught = []
-
-    # Assign new departments
-    for dept_id in department_ids:
-        department = Department.query.get(dept_id)
-        if department:
-            user.departments_taught.append(department)
+    # Replace the existing departments; unknown IDs are skipped. One query for all of them
+    user.departments_taught = Department.query.filter(Department.id.in_(department_ids)).all() if department_ids else []
 
     db.session.commit()
     log_activity('professor_departments_assigned', f"Professor '{user.username}' departments updated.")
     return jsonify(message="Professor departments updated successfully.")
 
+ADMIN_BATCH_OPERATIONS = {
+    'set_role': ('role',),
+    'assign_department': ('department_id',),
+    'assign_section': ('section_id',),
+    'set_professor_departments': ('department_ids',)
+}
+ASSIGNABLE_ROLES = ['student', 'moderator', 'professor', 'super_admin']
+
+@api.route('/admin/batch', methods=['POST'])
+@super_admin_required()
+def admin_batch():
+    """Applies an ordered list of user administration operations in one transaction.
+
+    Body: {"operations": [{"op": "set_role", "user_id": 1, "role": "professor"},
+    {"op": "assign_department", "user_id": 2, "department_id": 3},
+    {"op": "assign_section", "user_id": 2, "section_id": 5},
+    {"op": "set_professor_departments", "user_id": 1, "department_ids": [3, 4]}]}
+
+    Each operation follows the rules of its single-user endpoint, checked
+    against the state left by the operations before it. Every referenced
+    user, department and section is loaded with one IN query per table. If
+    any operation is invalid nothing is applied, and every problem is
+    reported by operation index.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify(error="operations must be a non-empty list."), 400
+    if len(operations) > MAX_ADMIN_BATCH_OPERATIONS:
+        return jsonify(error=f"A maximum of {MAX_ADMIN_BATCH_OPERATIONS} operations can be applied at once."), 400
+
+    errors = []
+    user_ids, department_ids, section_ids = set(), set(), set()
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in ADMIN_BATCH_OPERATIONS:
+            errors.append({'index': index, 'error': f"op must be one of {', '.join(ADMIN_BATCH_OPERATIONS)}."})
+            continue
+        missing = [field for field in ('user_id',) + ADMIN_BATCH_OPERATIONS[operation['op']] if field not in operation]
+        if missing:
+            errors.append({'index': index, 'error': f"Missing {', '.join(missing)}."})
+            continue
+        # A string would otherwise be read one character per department ID
+        if operation['op'] == 'set_professor_departments' and not isinstance(operation['department_ids'], list):
+            errors.append({'index': index, 'error': "department_ids must be a list."})
+            continue
+        try:
+            user_ids.add(int(operation['user_id']))
+            if operation['op'] == 'assign_department' and operation['department_id']:
+                department_ids.add(int(operation['department_id']))
+            elif operation['op'] == 'assign_section' and operation['section_id']:
+                section_ids.add(int(operation['section_id']))
+            elif operation['op'] == 'set_professor_departments':
+                department_ids.update(int(dept_id) for dept_id in operation['department_ids'])
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'error': "IDs must be integers."})
+    if errors:
+        return jsonify(error="Invalid operations; nothing was applied.", errors=errors), 400
+
+    users = {u.id: u for u in User.query.options(selectinload(User.departments_taught)).filter(User.id.in_(user_ids))}
+    departments = {d.id: d for d in Department.query.filter(Department.id.in_(department_ids))} if department_ids else {}
+    sections = {s.id: s for s in Section.query.options(joinedload(Section.department)).filter(
+        Section.id.in_(section_ids))} if section_ids else {}
+
+    audit = []
+    now = datetime.utcnow()
+    admin_id = int(get_jwt_identity())
+    for index, operation in enumerate(operations):
+        user = users.get(int(operation['user_id']))
+        if not user:
+            errors.append({'index': index, 'error': "User not found."})
+            continue
+        error, action, details = apply_admin_operation(operation, user, departments, sections)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            audit.append({'user_id': admin_id, 'action': action, 'details': details[:255], 'timestamp': now})
+
+    if errors:
+        db.session.rollback()
+        return jsonify(error="Invalid operations; nothing was applied.", errors=errors), 400
+
+    # The audit entries go in with one multi-row INSERT, in the same transaction as the changes
+    db.session.execute(db.insert(Log), audit)
+    db.session.commit()
+    return jsonify(message=f"{len(operations)} operations applied.", applied=len(operations))
+
+def apply_admin_operation(operation, user, departments, sections):
+    """Applies one batch operation to ``user``; returns ``(error, action, details)``."""
+    op = operation['op']
+    if op == 'set_role':
+        new_role = operation['role']
+        if new_role not in ASSIGNABLE_ROLES:
+            return "Invalid role specified", None, None
+        if user.role == 'professor' and new_role != 'professor':
+            user.departments_taught = []
+        user.role = new_role
+        return None, 'admin_role_change', f"User '{user.username}' role changed to '{new_role}'."
+
+    if op == 'assign_department':
+        if user.role != 'student':
+            return "This user is not a student.", None, None
+        department_id = operation['department_id']
+        if department_id and int(department_id) not in departments:
+            return "Department not found.", None, None
+        user.department_id = int(department_id) if department_id else None
+        return None, 'student_department_assigned', \
+            f"Student '{user.username}' assigned to department ID {department_id}."
+
+    if op == 'assign_section':
+        if user.role not in ['student', 'moderator']:
+            return "This user is not a student.", None, None
+        section_id = operation['section_id']
+        section = sections.get(int(section_id)) if section_id else None
+        if section_id and not section:
+            return "Section not found.", None, None
+        user.section_id = section.id if section else None
+        user.department_id = section.department_id if section else None
+        return None, 'student_section_assigned', f"Student '{user.username}' assigned to section ID {section_id}."
+
+    if user.role != 'professor':
+        return "This user is not a professor.", None, None
+    department_ids = list(dict.fromkeys(int(dept_id) for dept_id in operation['department_ids']))
+    missing = [dept_id for dept_id in department_ids if dept_id not in departments]
+    if missing:
+        return f"Departments not found: {', '.join(map(str, missing))}.", None, None
+    user.departments_taught = [departments[dept_id] for dept_id in department_ids]
+    return None, 'professor_departments_assigned', f"Professor '{user.username}' departments updated."
+
 @api.route('/admin/sessions', methods=['POST'])
 @super_admin_required()
 def create_session():
@@ -819,7 +2138,8 @@ def create_session():
 
     new_session = AcademicSession(
         year_name=data['year_name'],
-        is_active=data.get('is_active', False)
+        is_active=data.get('is_active', False),
+        activated_at=datetime.utcnow() if data.get('is_active') else None
     )
     db.session.add(new_session)
     db.session.commit()
@@ -847,6 +2167,8 @@ def update_session(session_id):
     if data.get('is_active'):
         AcademicSession.query.filter(AcademicSession.id != session_id).update({AcademicSession.is_active: False})
 
+    if data.get('is_active') and not session.is_active:
+        session.activated_at = datetime.utcnow()
     session.year_name = data.get('year_name', session.year_name)
     session.is_active = data.get('is_active', session.is_active)
     
@@ -862,11 +2184,85 @@ def delete_session(session_id):
     if session.sections:
         return jsonify(error="Cannot delete session with associated sections. Please delete them first."), 409
 
+    SessionRollover.query.filter(db.or_(SessionRollover.source_session_id == session_id,
+                                        SessionRollover.target_session_id == session_id)).delete(synchronize_session=False)
     db.session.delete(session)
     db.session.commit()
     log_activity('session_deleted', f"Session ID {session_id} ('{session.year_name}') deleted.")
     return jsonify(message="Academic session deleted successfully")
 
+@api.route('/admin/sessions/<int:session_id>/rollover', methods=['POST'])
+@super_admin_required()
+def rollover_session(session_id):
+    """Starts a background job that clones the session's sections one year up into the next session and promotes its students.
+
+    JSON body (all optional): year_name of the new session (defaults to the
+    next year after the source's), activate (make the new session the active
+    one when done). Returns the job, whose progress GET /admin/rollovers/<id>
+    reports.
+    """
+    source = AcademicSession.query.get_or_404(session_id)
+    data = request.get_json(silent=True) or {}
+
+    year_name = data.get('year_name') or next_year_name(source.year_name)
+    if not year_name:
+        return jsonify(error="Could not derive the next year name; please provide year_name."), 400
+    if year_name == source.year_name:
+        return jsonify(error="The new session must differ from the source session."), 400
+
+    stale_before = datetime.utcnow() - timedelta(seconds=ROLLOVER_STALE_SECONDS)
+    running = SessionRollover.query.filter(
+        SessionRollover.source_session_id == session_id,
+        SessionRollover.status.in_(['pending', 'running']),
+        SessionRollover.updated_at > stale_before
+    ).first()
+    if running:
+        return jsonify(error="A rollover of this session is already in progress.", job=serialize_rollover(running)), 409
+
+    # Re-running against an existing target is safe: sections and students already moved are skipped
+    target = AcademicSession.query.filter_by(year_name=year_name).first()
+    if not target:
+        target = AcademicSession(year_name=year_name, is_active=False)
+        db.session.add(target)
+        db.session.flush()
+
+    job = SessionRollover(
+        source_session_id=source.id,
+        target_session_id=target.id,
+        activate=bool(data.get('activate', False)),
+        created_by=int(get_jwt_identity())
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    start_rollover(current_app._get_current_object(), job.id)
+    return jsonify(serialize_rollover(job)), 202
+
+@api.route('/admin/rollovers/<int:job_id>', methods=['GET'])
+@primary_only
+@super_admin_required()
+def get_rollover(job_id):
+    job = SessionRollover.query.get_or_404(job_id)
+    return jsonify(serialize_rollover(job))
+
+def serialize_rollover(job):
+    return {
+        'id': job.id,
+        'status': job.status,
+        'source_session_id': job.source_session_id,
+        'target_session_id': job.target_session_id,
+        'target_year_name': job.target_session.year_name,
+        'activate': job.activate,
+        'sections_created': job.sections_created,
+        'students_total': job.students_total,
+        'students_done': job.students_promoted + job.students_graduated,
+        'students_promoted': job.students_promoted,
+        'students_graduated': job.students_graduated,
+        'error': job.error,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at
+    }
+
 @api.route('/admin/sections', methods=['POST'])
 @super_admin_required()
 def create_section():
@@ -929,6 +2325,8 @@ def delete_section(section_id):
     
     if section.students:
         return jsonify(error="Cannot delete section with assigned students."), 409
+    if db.session.query(archived_note_sections).filter(archived_note_sections.c.section_id == section_id).first():
+        return jsonify(error="Cannot delete section with archived notes."), 409
 
     db.session.delete(section)
     db.session.commit()
@@ -987,6 +2385,19 @@ def get_public_profile(username):
         }
         notes_list.append(note_data)
 
+    if include_archived():
+        archived_notes = ArchivedNote.query.filter_by(user_id=user.id).order_by(ArchivedNote.created_at.desc()).all()
+        notes_list.extend({
+            'id': note.id,
+            'title': note.title,
+            'subject': note.subject,
+            'semester': note.semester,
+            'academic_year': note.academic_year,
+            'is_verified': note.is_verified,
+            'author_username': user.username,
+            'archived': True
+        } for note in archived_notes)
+
     return jsonify({
         'user': public_user_data,
         'notes': notes_list
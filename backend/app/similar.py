@@ -0,0 +1,258 @@
+import math
+import re
+from array import array
+from collections import Counter
+import numpy as np
+from .indexing import RebuildableIndex, normalize
+
+_WORD = re.compile(r'[^\W\d_]{2,}')
+
+
+def term_counts(text):
+    return Counter(_WORD.findall(normalize(text)))
+
+
+class _Matrix:
+    """Sparse document-term matrix kept column-wise (one posting list per term).
+
+    Like the trigram postings, every list is a typed ``array`` that NumPy
+    can view without copying; updating a document appends a new slot and
+    tombstones the old one.
+    """
+
+    def __init__(self):
+        self.columns = {}        # term -> (array('i') of slots, array('f') of weights)
+        self.slot_ids = array('q')
+        self.alive = array('b')
+        self.kth = array('f')    # score a newcomer must beat to enter the slot's top-k
+        self.slots = {}
+        self.neighbors = {}      # doc_id -> [(score, other_id)], best first
+        self.df = Counter()
+        self.doc_terms = {}      # doc_id -> terms counted in df
+        self.total_docs = 0
+
+    def insert(self, doc_id, vector):
+        slot = len(self.slot_ids)
+        self.slot_ids.append(doc_id)
+        self.alive.append(1)
+        self.kth.append(0.0)
+        self.slots[doc_id] = slot
+        for term, weight in vector.items():
+            column = self.columns.get(term)
+            if column is None:
+                column = self.columns[term] = (array('i'), array('f'))
+            column[0].append(slot)
+            column[1].append(weight)
+        return slot
+
+
+class SimilarityIndex(RebuildableIndex):
+    """TF-IDF "related notes" with precomputed top-k neighbours.
+
+    Documents are sublinear-TF x smoothed-IDF vectors, L2-normalized and
+    pruned to their ``max_terms`` heaviest terms, so a dot product is a
+    cosine similarity; terms found in more than ``max_df`` of the notes are
+    dropped like stop words. A rebuild lays the matrix out as CSR and CSC
+    arrays and scores documents in blocks, one sparse matrix product per
+    block (expand the block's terms into their posting lists, then a single
+    ``bincount``), keeping each document's ``k`` best neighbours.
+
+    ``add`` scores the new vector against every document at once, sets its
+    neighbours and pushes it into the lists it now belongs to; IDF weights
+    of existing documents only move at the next rebuild. Removed documents
+    are filtered out of neighbour lists when read. Adds and removes made
+    while a rebuild runs are replayed on its result, so they are not lost
+    when it replaces the current contents.
+    """
+
+    def __init__(self, k=10, max_terms=64, max_df=0.1, min_docs_for_max_df=100, block_cells=1 << 22):
+        super().__init__()
+        self.k = k
+        self.max_terms = max_terms
+        self.max_df = max_df
+        self.min_docs_for_max_df = min_docs_for_max_df
+        self.block_cells = block_cells
+        self._state = _Matrix()
+        # Changes to replay once the running rebuild swaps in its state; None when none is running
+        self._changes = None
+
+    def __len__(self):
+        return len(self._state.slots)
+
+    def _vectorize(self, counts, df, total_docs):
+        # Terms in more than max_df of the notes say little about them and make the posting lists long
+        max_count = self.max_df * total_docs if total_docs >= self.min_docs_for_max_df else float('inf')
+        weights = {
+            term: (1 + math.log(count)) * (math.log((1 + total_docs) / (1 + df.get(term, 0))) + 1)
+            for term, count in counts.items() if df.get(term, 0) <= max_count
+        }
+        if len(weights) > self.max_terms:
+            weights = dict(sorted(weights.items(), key=lambda item: -item[1])[:self.max_terms])
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    @property
+    def rebuilding(self):
+        return self._changes is not None
+
+    def _load(self, items):
+        with self._lock:
+            self._changes = []
+        try:
+            state = self._build(items)
+        except Exception:
+            with self._lock:
+                self._changes = None
+            raise
+
+        with self._lock:
+            self._state = state
+            changes, self._changes = self._changes, None
+            for doc_id, text in changes:
+                if text is None:
+                    self._remove(doc_id)
+                else:
+                    self._add(doc_id, text)
+
+    def _build(self, items):
+        documents = [(doc_id, term_counts(text)) for doc_id, text in items]
+        state = _Matrix()
+        for doc_id, counts in documents:
+            state.df.update(counts.keys())
+            state.doc_terms[doc_id] = list(counts)
+        state.total_docs = len(documents)
+
+        vectors = [(doc_id, self._vectorize(counts, state.df, state.total_docs)) for doc_id, counts in documents]
+        for doc_id, vector in vectors:
+            state.insert(doc_id, vector)
+        self._compute_all_neighbors(state, [vector for _, vector in vectors])
+        return state
+
+    def _compute_all_neighbors(self, state, vectors):
+        slots = len(state.slot_ids)
+        if not slots:
+            return
+
+        # CSR (documents x terms) and CSC (terms x documents) views of the same matrix
+        term_ids = {}
+        lengths = np.fromiter((len(vector) for vector in vectors), dtype=np.int64, count=slots)
+        row_ptr = np.concatenate([[0], np.cumsum(lengths)])
+        row_terms = np.fromiter((term_ids.setdefault(term, len(term_ids)) for vector in vectors for term in vector),
+                                dtype=np.int64, count=int(row_ptr[-1]))
+        row_weights = np.fromiter((weight for vector in vectors for weight in vector.values()),
+                                  dtype=np.float64, count=int(row_ptr[-1]))
+        by_term = np.argsort(row_terms, kind='stable')
+        col_slots = np.repeat(np.arange(slots), lengths)[by_term]
+        col_weights = row_weights[by_term]
+        col_ptr = np.concatenate([[0], np.cumsum(np.bincount(row_terms, minlength=len(term_ids)))])
+
+        block = max(1, self.block_cells // slots)
+        for start in range(0, slots, block):
+            size = min(block, slots - start)
+            first, last = row_ptr[start], row_ptr[start + size]
+            if first == last:
+                continue
+            terms = row_terms[first:last]
+            rows = np.repeat(np.arange(size), lengths[start:start + size])
+
+            # Expand every (row, term) pair into that term's posting list, all at once
+            counts = col_ptr[terms + 1] - col_ptr[terms]
+            offsets = np.repeat(col_ptr[terms] - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+            positions = offsets + np.arange(counts.sum())
+            scores = np.bincount(
+                np.repeat(rows, counts) * slots + col_slots[positions],
+                weights=np.repeat(row_weights[first:last], counts) * col_weights[positions],
+                minlength=size * slots
+            ).reshape(size, slots)
+            scores[np.arange(size), np.arange(start, start + size)] = 0
+
+            # Top-k of every row of the block at once
+            k = min(self.k, slots)
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind='stable')
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            for row in range(size):
+                neighbors = [(float(score), int(state.slot_ids[slot]))
+                             for slot, score in zip(best[row], best_scores[row]) if score > 0]
+                state.neighbors[state.slot_ids[start + row]] = neighbors
+                state.kth[start + row] = self._kth(neighbors)
+
+    def _top(self, state, scores):
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > self.k:
+            candidates = candidates[np.argpartition(-scores[candidates], self.k - 1)[:self.k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(float(scores[slot]), int(state.slot_ids[slot])) for slot in candidates]
+
+    def _kth(self, neighbors):
+        return neighbors[-1][0] if len(neighbors) >= self.k else 0.0
+
+    def _score(self, state, vector):
+        slots = len(state.slot_ids)
+        parts = [(state.columns[term], weight) for term, weight in vector.items() if term in state.columns]
+        if not parts:
+            return np.zeros(slots)
+        scores = np.bincount(
+            np.concatenate([np.frombuffer(c[0], dtype=np.int32) for c, _ in parts]),
+            weights=np.concatenate([np.frombuffer(c[1], dtype=np.float32) * w for c, w in parts]),
+            minlength=slots
+        )
+        scores[np.frombuffer(state.alive, dtype=np.int8) == 0] = 0
+        return scores
+
+    def add(self, doc_id, text):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((doc_id, text))
+            self._add(doc_id, text)
+
+    def _add(self, doc_id, text):
+        state = self._state
+        self._remove(doc_id)
+        counts = term_counts(text)
+        state.df.update(counts.keys())
+        state.doc_terms[doc_id] = list(counts)
+        state.total_docs += 1
+
+        vector = self._vectorize(counts, state.df, state.total_docs)
+        scores = self._score(state, vector)
+        slot = state.insert(doc_id, vector)
+        neighbors = state.neighbors[doc_id] = self._top(state, scores)
+        state.kth[slot] = self._kth(neighbors)
+
+        # Only documents whose current k-th best this one beats need their lists touched
+        kth = np.frombuffer(state.kth, dtype=np.float32)[:len(scores)]
+        for other_slot in np.flatnonzero(scores > kth):
+            other_id = int(state.slot_ids[other_slot])
+            entries = [entry for entry in state.neighbors.get(other_id, []) if entry[1] != doc_id]
+            entries.append((float(scores[other_slot]), doc_id))
+            entries.sort(key=lambda entry: -entry[0])
+            state.neighbors[other_id] = entries[:self.k]
+            state.kth[other_slot] = self._kth(state.neighbors[other_id])
+
+    def remove(self, doc_id):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((doc_id, None))
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        state = self._state
+        slot = state.slots.pop(doc_id, None)
+        if slot is None:
+            return
+        state.alive[slot] = 0
+        state.kth[slot] = float('inf')
+        state.neighbors.pop(doc_id, None)
+        state.df.subtract(state.doc_terms.pop(doc_id, ()))
+        state.total_docs -= 1
+
+    def similar(self, doc_id, limit=None):
+        """Returns up to ``limit`` ``(other_id, score)`` pairs from the precomputed neighbours, best first."""
+        with self._lock:
+            state = self._state
+            neighbors = [(other_id, score) for score, other_id in state.neighbors.get(doc_id, ())
+                         if other_id in state.slots]
+        return neighbors[:limit]
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+# Scores are stored anchored at EPOCH: an event of weight w at time t adds
+# w * 2^((t - EPOCH) / HALF_LIFE). Every stored score then decays at the
+# same rate, so ordering by the stored value is ordering by the decayed
+# score, and an event is one additive UPDATE with no periodic decay pass.
+# Stored values grow 2^(1/3)-fold a day, so the double-precision columns
+# (max about 2^1024) last about eight years; before then move EPOCH forward
+# and run `flask notes rebase-trending <old epoch>` (rebase_scores below).
+EPOCH = datetime(2026, 1, 1)
+HALF_LIFE_SECONDS = 3 * 24 * 60 * 60
+
+UPLOAD_WEIGHT = 2.0
+VIEW_WEIGHT = 1.0
+DOWNLOAD_WEIGHT = 3.0
+# Engagement with verified notes counts for more
+VERIFIED_BOOST = 1.5
+
+
+def growth(at=None):
+    return 2.0 ** (((at or datetime.utcnow()) - EPOCH).total_seconds() / HALF_LIFE_SECONDS)
+
+
+def event_score(weight, verified=False, at=None):
+    return weight * (VERIFIED_BOOST if verified else 1.0) * growth(at)
+
+
+def engagement_score(views, downloads, verified=False, at=None):
+    return event_score(views * VIEW_WEIGHT + downloads * DOWNLOAD_WEIGHT, verified, at)
+
+
+def decayed(stored_score, at=None):
+    """The stored score as of ``at``: the sum of each event's weight halved once per elapsed half-life."""
+    return stored_score / growth(at)
+
+
+def rebase_scores(old_epoch):
+    """Re-anchors every stored score from ``old_epoch`` to the current EPOCH, in one transaction.
+
+    Scores are divided by ``growth`` between the two epochs, which leaves
+    every decayed score and so every ordering unchanged. Run it as a
+    release step, after the workers built with the old EPOCH have stopped
+    and before the new ones start; events counted in between with the
+    other epoch would be off by the same factor. A log entry records the
+    rebase, and a second run for the same epoch is refused. Returns the
+    factor, or None if the scores were already rebased.
+    """
+    from . import db
+    from .models import Note, ArchivedNote, Log, ArchivedLog
+    from .logger import log_activity
+
+    details = f"Trending scores rebased from {old_epoch:%Y-%m-%d} to {EPOCH:%Y-%m-%d}."
+    for model in (Log, ArchivedLog):
+        if model.query.filter(model.action == 'trending_rebase', model.details == details).first():
+            return None
+
+    factor = growth(EPOCH) / growth(old_epoch)
+    for model in (Note, ArchivedNote):
+        model.query.update({model.trending_score: model.trending_score / factor}, synchronize_session=False)
+    # log_activity commits, so the entry and both updates land together
+    log_activity('trending_rebase', details)
+    return factor
@@ -0,0 +1,137 @@
+import re
+from array import array
+import numpy as np
+from .indexing import RebuildableIndex, normalize
+
+_WORD = re.compile(r'\w+')
+
+
+def trigrams(text):
+    # Same padding as PostgreSQL's pg_trgm: two spaces before each word, one after
+    grams = set()
+    for word in _WORD.findall(normalize(text)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _Postings:
+    """Trigram -> slot posting lists plus per-slot document id and trigram count.
+
+    Every list is a typed ``array`` so it can be viewed as a NumPy array
+    without copying, and appending a document never touches existing slots.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.slot_ids = array('q')
+        self.slot_sizes = array('i')
+        self.slots = {}
+        self.dead = 0
+
+    def insert(self, doc_id, text):
+        grams = trigrams(text)
+        if not grams:
+            return
+        slot = len(self.slot_ids)
+        self.slot_ids.append(doc_id)
+        self.slot_sizes.append(len(grams))
+        self.slots[doc_id] = slot
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('i')
+            posting.append(slot)
+
+
+class TrigramIndex(RebuildableIndex):
+    """Typo-tolerant search over one text field, scored like pg_trgm's similarity().
+
+    A query is scored in a handful of vectorized NumPy operations: the
+    posting lists of its trigrams are concatenated and ``bincount`` yields
+    the shared-trigram count of every document at once. Removed documents
+    are tombstoned and the postings are compacted once more than
+    ``compact_ratio`` of the slots are dead.
+    """
+
+    def __init__(self, compact_ratio=0.5):
+        super().__init__()
+        self.compact_ratio = compact_ratio
+        self._state = _Postings()
+
+    def __len__(self):
+        return len(self._state.slots)
+
+    def _load(self, items):
+        state = _Postings()
+        for doc_id, text in items:
+            state.insert(doc_id, text)
+        with self._lock:
+            self._state = state
+
+    def add(self, doc_id, text):
+        with self._lock:
+            self._remove(doc_id)
+            self._state.insert(doc_id, text)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        state = self._state
+        slot = state.slots.pop(doc_id, None)
+        if slot is None:
+            return
+        state.slot_sizes[slot] = 0
+        state.dead += 1
+        if state.dead > len(state.slot_ids) * self.compact_ratio:
+            self._compact()
+
+    def _compact(self):
+        old = self._state
+        sizes = np.frombuffer(old.slot_sizes, dtype=np.int32)
+        alive = sizes > 0
+        # Old slot -> new slot; only read for live slots
+        remap = (np.cumsum(alive) - 1).astype(np.int32)
+
+        state = _Postings()
+        state.slot_ids = array('q', np.frombuffer(old.slot_ids, dtype=np.int64)[alive].tobytes())
+        state.slot_sizes = array('i', sizes[alive].tobytes())
+        state.slots = {doc_id: i for i, doc_id in enumerate(state.slot_ids)}
+        for gram, posting in old.postings.items():
+            slots = np.frombuffer(posting, dtype=np.int32)
+            kept = remap[slots[alive[slots]]]
+            if len(kept):
+                state.postings[gram] = array('i', kept.tobytes())
+        self._state = state
+
+    def search(self, text, limit=100, threshold=0.3):
+        """Returns up to ``limit`` ``(doc_id, similarity)`` pairs, best first."""
+        grams = trigrams(text)
+        if not grams:
+            return []
+        with self._lock:
+            # Score inside the lock: the NumPy views must be released before the arrays grow
+            return self._score(grams, limit, threshold)
+
+    def _score(self, grams, limit, threshold):
+        state = self._state
+        postings = [state.postings[gram] for gram in grams if gram in state.postings]
+        if not postings:
+            return []
+
+        slots = np.concatenate([np.frombuffer(posting, dtype=np.int32) for posting in postings])
+        shared = np.bincount(slots, minlength=len(state.slot_ids))
+        sizes = np.frombuffer(state.slot_sizes, dtype=np.int32)
+
+        scores = shared / np.maximum(len(grams) + sizes - shared, 1)
+        scores[sizes == 0] = 0
+
+        matches = np.flatnonzero(scores >= threshold)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        matches = matches[np.argsort(-scores[matches], kind='stable')]
+
+        doc_ids = np.frombuffer(state.slot_ids, dtype=np.int64)
+        return [(int(doc_ids[slot]), float(scores[slot])) for slot in matches]
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import math
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from flask import current_app
+
+_UPLOAD_ID = re.compile(r'^[A-Za-z0-9_-]{22}$')
+_CHUNK_NAME = re.compile(r'^(\d+)\.part$')
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadSpool:
+    """Local disk spool for resumable chunked uploads.
+
+    Each upload is a directory holding ``upload.json`` (owner, size, chunk
+    size and the note fields given at init) plus one file per received
+    chunk. A chunk is written under a temporary name and renamed only once
+    its length and SHA-256 match, so a retried or interrupted PUT never
+    leaves a partial chunk behind. Every worker of a host must see the same
+    ``UPLOAD_SPOOL_DIR``. Invalid requests raise ``ValueError``.
+
+    Completing an upload first claims it with a ``complete.json`` marker,
+    so a retried or concurrent completion never assembles the file again or
+    creates a second note. Once the note exists the marker holds its id;
+    the chunks and assembled file are dropped when the background jobs are
+    done, while the manifest and marker stay until the upload expires.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('UPLOAD_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'notehub-uploads'))
+        app.config.setdefault('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024)
+        app.config.setdefault('UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+        # Uploads untouched for this many seconds are removed
+        app.config.setdefault('UPLOAD_SPOOL_TTL', 24 * 60 * 60)
+        # A claim not finished within this many seconds is taken to have died with its worker
+        app.config.setdefault('UPLOAD_CLAIM_TIMEOUT', 10 * 60)
+        app.extensions['upload_spool'] = self
+
+    def create(self, user_id, filename, size, sha256, fields):
+        config = current_app.config
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("size must be a positive number of bytes.")
+        if size > config['UPLOAD_MAX_SIZE']:
+            raise ValueError(f"File is larger than the {config['UPLOAD_MAX_SIZE']} byte limit.")
+
+        self.prune()
+        upload_id = secrets.token_urlsafe(16)
+        manifest = {
+            'upload_id': upload_id,
+            'user_id': user_id,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'chunk_size': config['UPLOAD_CHUNK_SIZE'],
+            'total_chunks': math.ceil(size / config['UPLOAD_CHUNK_SIZE']),
+            'fields': fields,
+            'created_at': time.time()
+        }
+        directory = self._directory(upload_id)
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'upload.json'), 'w') as f:
+            json.dump(manifest, f)
+        return dict(manifest, dir=directory)
+
+    def get(self, upload_id):
+        if not _UPLOAD_ID.match(upload_id):
+            return None
+        directory = self._directory(upload_id)
+        try:
+            with open(os.path.join(directory, 'upload.json')) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        return dict(manifest, dir=directory)
+
+    def received(self, manifest):
+        chunks = (_CHUNK_NAME.match(name) for name in os.listdir(manifest['dir']))
+        return sorted(int(match.group(1)) for match in chunks if match)
+
+    def write_chunk(self, manifest, index, stream, checksum):
+        """Streams chunk ``index`` to disk; re-sending a chunk replaces it."""
+        if not 0 <= index < manifest['total_chunks']:
+            raise ValueError(f"Chunk index must be between 0 and {manifest['total_chunks'] - 1}.")
+        if not checksum:
+            raise ValueError("Missing X-Chunk-Checksum header (SHA-256 of the chunk, hex).")
+
+        chunk_size = manifest['chunk_size']
+        expected = min(chunk_size, manifest['size'] - index * chunk_size)
+        final_path = os.path.join(manifest['dir'], f"{index}.part")
+        temp_path = f"{final_path}.{secrets.token_hex(4)}.tmp"
+
+        digest = hashlib.sha256()
+        length = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                # Read one byte past the expected length so an oversized chunk is detected
+                while length <= expected:
+                    block = stream.read(min(COPY_BUFFER_SIZE, expected + 1 - length))
+                    if not block:
+                        break
+                    digest.update(block)
+                    length += len(block)
+                    f.write(block)
+            if length != expected:
+                raise ValueError(f"Chunk {index} must be exactly {expected} bytes, got {length}.")
+            if digest.hexdigest() != checksum.lower():
+                raise ValueError(f"Checksum mismatch for chunk {index}; send it again.")
+            os.replace(temp_path, final_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def assemble(self, manifest):
+        """Concatenates the chunks into one file, block by block, and returns its path."""
+        missing = sorted(set(range(manifest['total_chunks'])) - set(self.received(manifest)))
+        if missing:
+            raise ValueError(f"Missing chunks: {missing[:20]}")
+
+        path = os.path.join(manifest['dir'], 'assembled')
+        digest = hashlib.sha256()
+        with open(path, 'wb') as out:
+            for index in range(manifest['total_chunks']):
+                with open(os.path.join(manifest['dir'], f"{index}.part"), 'rb') as chunk:
+                    for block in iter(lambda: chunk.read(COPY_BUFFER_SIZE), b''):
+                        digest.update(block)
+                        out.write(block)
+
+        if manifest['sha256'] and digest.hexdigest() != manifest['sha256']:
+            os.remove(path)
+            raise ValueError("The assembled file does not match the SHA-256 given at init.")
+        return path
+
+    def claim(self, manifest):
+        """Marks the upload as being completed; False if another request holds or finished the claim."""
+        path = self._claim_path(manifest)
+        try:
+            # O_EXCL: exactly one of several workers creating the marker succeeds
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+        try:
+            stale = (self.completed_note(manifest) is None and
+                     time.time() - os.path.getmtime(path) > current_app.config['UPLOAD_CLAIM_TIMEOUT'])
+            if not stale:
+                return False
+            # Only one request can move the stale marker away; it then claims afresh
+            stale_path = f"{path}.{secrets.token_hex(4)}.stale"
+            os.rename(path, stale_path)
+            os.remove(stale_path)
+        except FileNotFoundError:
+            return False
+        return self.claim(manifest)
+
+    def is_claimed(self, manifest):
+        return os.path.exists(self._claim_path(manifest))
+
+    def release(self, manifest):
+        """Gives up a claim whose completion failed, so the client can fix the upload and retry."""
+        try:
+            os.remove(self._claim_path(manifest))
+        except FileNotFoundError:
+            pass
+
+    def finish(self, manifest, note_id):
+        path = self._claim_path(manifest)
+        temp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'note_id': note_id}, f)
+        os.replace(temp_path, path)
+
+    def completed_note(self, manifest):
+        """Id of the note the upload was completed into, or None."""
+        try:
+            with open(self._claim_path(manifest)) as f:
+                return json.load(f)['note_id']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def drop_data(self, manifest):
+        """Removes the chunks and the assembled file but keeps the manifest and claim until the upload expires."""
+        for name in os.listdir(manifest['dir']):
+            if name == 'assembled' or _CHUNK_NAME.match(name):
+                try:
+                    os.remove(os.path.join(manifest['dir'], name))
+                except FileNotFoundError:
+                    pass
+
+    def discard(self, manifest):
+        shutil.rmtree(manifest['dir'], ignore_errors=True)
+
+    def prune(self):
+        root = current_app.config['UPLOAD_SPOOL_DIR']
+        cutoff = time.time() - current_app.config['UPLOAD_SPOOL_TTL']
+        os.makedirs(root, exist_ok=True)
+        for entry in os.scandir(root):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _claim_path(self, manifest):
+        return os.path.join(manifest['dir'], 'complete.json')
+
+    def _directory(self, upload_id):
+        return os.path.join(current_app.config['UPLOAD_SPOOL_DIR'], upload_id)
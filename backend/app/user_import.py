@@ -0,0 +1,266 @@
+import codecs
+import csv
+import json
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from werkzeug.security import generate_password_hash
+from . import db
+from .models import User, Department, Section, AcademicSession, UserImport
+from .logger import log_activity
+
+IMPORT_BATCH_SIZE = 500
+# Rows listed individually in a report; the counts always cover every row
+IMPORT_MAX_ERRORS = 1000
+IMPORTABLE_ROLES = ('student', 'moderator', 'professor')
+COLLEGE_EMAIL_DOMAIN = '@imsec.ac.in'
+
+
+def read_roster(stream, fmt):
+    """Yields ``(row_number, record)`` from a CSV or NDJSON byte stream, one row at a time.
+
+    CSV needs a header row; NDJSON is one JSON object per line. A record
+    that cannot be parsed is yielded as a string describing the problem.
+    """
+    text = codecs.getreader('utf-8-sig')(stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, "Each line must be a JSON object."
+            continue
+        yield row_number, {str(key).lower(): str(value).strip() if value is not None else ''
+                           for key, value in record.items()}
+
+
+def roster_format(filename, fmt=None):
+    fmt = (fmt or filename.rsplit('.', 1)[-1]).lower()
+    if fmt in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return 'csv' if fmt == 'csv' else None
+
+
+class RosterImporter:
+    """Creates users from roster rows in batches, reporting every rejected row.
+
+    Departments (by short name) and sections of the active session (by
+    section code, e.g. ``2CSE1``) are loaded into dicts once. Each batch
+    checks its emails, usernames and college IDs with one ``IN`` query
+    each, hashes passwords on a thread pool (PBKDF2 releases the GIL), and
+    inserts its users with one multi-row INSERT in its own transaction. If
+    that INSERT hits a unique constraint, say from a concurrent signup,
+    the batch is retried row by row so only the offending rows fail.
+
+    Columns: email and username are required; password (a random one is
+    set when it is empty, for the user to replace through forgot-password),
+    role (student, moderator or professor), college_id (derived from the
+    email like at signup), department (short name; otherwise parsed from
+    the college ID) and section (code in the active session).
+    """
+
+    def __init__(self, hash_workers=4, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.hash_workers = max(1, hash_workers)
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.departments = {d.short_name.upper(): d.id for d in Department.query.with_entities(
+            Department.id, Department.short_name)}
+        active = AcademicSession.query.filter_by(is_active=True).first()
+        sections = Section.query.options(joinedload(Section.department)).filter_by(
+            academic_session_id=active.id).all() if active else []
+        self.sections = {section.section_code.upper(): (section.id, section.department_id) for section in sections}
+        # Values already taken by earlier rows of this file
+        self.seen = {'email': set(), 'username': set(), 'college_id': set()}
+        self.report = {'rows': 0, 'created': 0, 'failed': 0, 'random_passwords': 0, 'errors': []}
+
+    def run(self, records, on_batch=None, on_created=None):
+        batch = []
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            for row_number, record in records:
+                self.report['rows'] += 1
+                if isinstance(record, str):
+                    self._fail(row_number, None, record)
+                    continue
+                row = self._validate(row_number, record)
+                if row:
+                    batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._import_batch(pool, batch, on_created)
+                    batch = []
+                    if on_batch:
+                        on_batch(self.report)
+            if batch:
+                self._import_batch(pool, batch, on_created)
+        # Rows rejected by the database checks are reported after the ones rejected while reading
+        self.report['errors'].sort(key=lambda error: error['row'])
+        if on_batch:
+            on_batch(self.report)
+        return self.report
+
+    def _fail(self, row_number, email, error):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < IMPORT_MAX_ERRORS:
+            self.report['errors'].append({'row': row_number, 'email': email, 'error': error})
+
+    def _validate(self, row_number, record):
+        email = record.get('email', '').lower()
+        username = record.get('username', '')
+        role = record.get('role', '').lower() or 'student'
+        if not email or not username:
+            return self._fail(row_number, email or None, "email and username are required.")
+        if not email.endswith(COLLEGE_EMAIL_DOMAIN):
+            return self._fail(row_number, email, f"Only college email addresses ({COLLEGE_EMAIL_DOMAIN}) are allowed.")
+        if role not in IMPORTABLE_ROLES:
+            return self._fail(row_number, email, f"role must be one of {', '.join(IMPORTABLE_ROLES)}.")
+
+        college_id = (record.get('college_id') or email.split('@')[0]).upper()
+        user = {'email': email, 'username': username, 'college_id': college_id, 'role': role,
+                'department_id': None, 'admission_year': None, 'section_id': None}
+        for field in self.seen:
+            if user[field] in self.seen[field]:
+                return self._fail(row_number, email, f"Duplicate {field} '{user[field]}' earlier in the file.")
+
+        department = record.get('department', '').upper()
+        if department:
+            if department not in self.departments:
+                return self._fail(row_number, email, f"Department '{department}' not found.")
+            user['department_id'] = self.departments[department]
+        else:
+            # Same parsing as signup; an unknown department just leaves it unset
+            user['department_id'] = self.departments.get(college_id[5:-5])
+        if user['department_id'] and college_id[1:5].isdigit():
+            user['admission_year'] = int(college_id[1:5])
+
+        section_code = record.get('section', '').upper()
+        if section_code:
+            if section_code not in self.sections:
+                return self._fail(row_number, email, f"Section '{section_code}' not found in the active session.")
+            if role == 'professor':
+                return self._fail(row_number, email, "Professors cannot be assigned a section.")
+            user['section_id'], user['department_id'] = self.sections[section_code]
+
+        for field in self.seen:
+            self.seen[field].add(user[field])
+        user['password'] = record.get('password', '')
+        user['row'] = row_number
+        return user
+
+    def _import_batch(self, pool, batch, on_created):
+        # One IN query per unique column for the whole batch
+        taken = {}
+        for field in self.seen:
+            column = getattr(User, field)
+            values = [row[field] for row in batch]
+            taken[field] = {value for (value,) in db.session.query(column).filter(column.in_(values))}
+        rows = []
+        for row in batch:
+            clash = next((field for field in self.seen if row[field] in taken[field]), None)
+            if clash:
+                self._fail(row['row'], row['email'], f"{clash} '{row[clash]}' is already in use.")
+            else:
+                rows.append(row)
+        if self.dry_run:
+            # Counted as if created; nothing is hashed or written
+            self.report['created'] += len(rows)
+            return
+        if not rows:
+            return
+
+        for row in rows:
+            if not row['password']:
+                row['password'] = secrets.token_urlsafe(24)
+                self.report['random_passwords'] += 1
+        hashes = pool.map(lambda row: generate_password_hash(row['password'], method='pbkdf2:sha256'), rows)
+        values = [
+            {'email': row['email'], 'username': row['username'], 'college_id': row['college_id'],
+             'role': row['role'], 'department_id': row['department_id'], 'admission_year': row['admission_year'],
+             'section_id': row['section_id'], 'password_hash': password_hash}
+            for row, password_hash in zip(rows, hashes)
+        ]
+
+        try:
+            db.session.execute(insert(User), values)
+            db.session.commit()
+            created = rows
+        except IntegrityError:
+            db.session.rollback()
+            created = []
+            for row, value in zip(rows, values):
+                try:
+                    db.session.execute(insert(User), [value])
+                    db.session.commit()
+                    created.append(row)
+                except IntegrityError:
+                    db.session.rollback()
+                    self._fail(row['row'], row['email'], "email, username or college_id is already in use.")
+        self.report['created'] += len(created)
+        if on_created:
+            on_created([row['username'] for row in created])
+
+
+def run_user_import(job_id, path, fmt, hash_workers, on_created=None):
+    """Imports the roster at ``path`` for a UserImport job, updating its counts after every batch."""
+    job = db.session.get(UserImport, job_id)
+    job.status = 'running'
+    db.session.commit()
+
+    def _progress(report):
+        job.rows_done = report['rows']
+        job.created_count = report['created']
+        job.failed_count = report['failed']
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    try:
+        importer = RosterImporter(hash_workers=hash_workers, dry_run=job.dry_run)
+        with open(path, 'rb') as stream:
+            report = importer.run(read_roster(stream, fmt), on_batch=_progress, on_created=on_created)
+        job.errors = json.dumps(report['errors'])
+        job.random_passwords = report['random_passwords']
+        job.status = 'done'
+        job.finished_at = job.updated_at = datetime.utcnow()
+        # Inside the try so a report the database rejects still ends the job as failed
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in user import {job_id}: {e}")
+        job.status = 'failed'
+        job.errors = json.dumps([{'row': None, 'email': None, 'error': str(e)[:255]}])
+        job.finished_at = job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    if job.status == 'done' and not job.dry_run:
+        log_activity('users_imported', (
+            f"Imported {job.created_count} users from '{job.filename}' ({job.failed_count} rows rejected)."
+        )[:255], user_id=job.created_by)
+
+
+def start_user_import(app, job_id, path, fmt, on_created=None):
+    """Runs the import in a background thread of this worker and removes the spooled roster when done."""
+    def _run():
+        with app.app_context():
+            try:
+                run_user_import(job_id, path, fmt, app.config['USER_IMPORT_HASH_WORKERS'], on_created)
+            finally:
+                db.session.remove()
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    threading.Thread(target=_run, name=f'user-import-{job_id}', daemon=True).start()
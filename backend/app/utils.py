@@ -1,14 +1,57 @@
-import firebase_admin
-from firebase_admin import credentials, storage
 from werkzeug.utils import secure_filename
+import json
 import os
+import threading
 import uuid
+import hashlib
 from urllib.parse import unquote, urlparse
 
 
+HASH_CHUNK_SIZE = 1024 * 1024
+FIREBASE_STORAGE_BUCKET = 'notehub-project.firebasestorage.app'
+_firebase_lock = threading.Lock()
+
+
+def get_storage_bucket():
+    """Returns the Firebase Storage bucket, initializing the Firebase app on first use in this process.
+
+    Nothing touches firebase_admin or the credentials until a file is
+    actually stored or deleted, so the app starts without them and each
+    gunicorn worker builds its own clients after the fork.
+    """
+    import firebase_admin
+    from firebase_admin import credentials, storage
+
+    with _firebase_lock:
+        try:
+            firebase_admin.get_app()
+        except ValueError:
+            firebase_cred_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
+            if firebase_cred_json:
+                cred = credentials.Certificate(json.loads(firebase_cred_json))
+            else:
+                # Fallback for local development
+                cred_path = os.path.join(os.path.dirname(__file__), '..', 'firebase-credentials.json')
+                cred = credentials.Certificate(cred_path)
+            firebase_admin.initialize_app(cred, {'storageBucket': FIREBASE_STORAGE_BUCKET})
+    return storage.bucket()
+
+
+def compute_file_hash(file):
+    # Streams the file in chunks so large uploads are never held twice in memory
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return digest.hexdigest(), size
+
+
 def upload_file_to_firebase(file, filename, content_type):
     try:
-        bucket = storage.bucket()
+        bucket = get_storage_bucket()
         original_filename = secure_filename(filename)
         _, file_extension = os.path.splitext(original_filename)
         unique_filename = f"{uuid.uuid4()}{file_extension}"
@@ -28,13 +71,32 @@ def upload_file_to_firebase(file, filename, content_type):
         return None
 
 
+def upload_bytes_to_firebase(data, object_name, content_type):
+    # Unlike upload_file_to_firebase the caller picks the object name, so re-uploads overwrite
+    try:
+        bucket = get_storage_bucket()
+        blob = bucket.blob(object_name)
+        blob.upload_from_string(data, content_type=content_type)
+        blob.make_public()
+        return blob.public_url
+
+    except Exception as e:
+        print(f"Error uploading '{object_name}' to Firebase: {e}")
+        return None
+
+
+def preview_object_name(file_hash):
+    # Flat, like the note files, because delete_file_from_firebase uses the last path segment
+    return f"{file_hash}-preview.jpg"
+
+
 def delete_file_from_firebase(file_url):
     if not file_url:
         print("Warning: No file URL provided to delete.")
         return False
         
     try:
-        bucket = storage.bucket() 
+        bucket = get_storage_bucket()
         
         parsed_url = urlparse(file_url)
 
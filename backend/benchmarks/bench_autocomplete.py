@@ -0,0 +1,55 @@
+"""Lookup latency and footprint of the autocomplete prefix index.
+
+Run from the backend directory:
+    python -m benchmarks.bench_autocomplete
+"""
+import random
+import string
+import sys
+import time
+import timeit
+from app.autocomplete import PrefixIndex
+
+SUBJECTS = 400
+USERS = 20000
+REPEAT = 2000
+
+
+def _word():
+    return ''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 10)))
+
+
+def _phrase(words):
+    return ' '.join(_word().capitalize() for _ in range(words))
+
+
+def main():
+    random.seed(0)
+    subjects = [_phrase(2) for _ in range(SUBJECTS)]
+    usernames = [_word() + str(i) for i in range(USERS)]
+
+    for notes in (10000, 100000, 300000):
+        terms = [('subject', random.choice(subjects)) for _ in range(notes)]
+        terms += [('title', _phrase(random.randint(2, 5))) for _ in range(notes)]
+        terms += [('user', name) for name in usernames]
+
+        index = PrefixIndex(max_terms=1000000)
+        start = time.perf_counter()
+        index.rebuild(terms)
+        build_time = time.perf_counter() - start
+
+        prefixes = [_word()[:random.randint(1, 4)] for _ in range(REPEAT)]
+        lookup_time = timeit.timeit(lambda: [index.lookup(p) for p in prefixes], number=1) / REPEAT
+
+        start = time.perf_counter()
+        for i in range(1000):
+            index.add('title', f"Benchmark title {i}")
+        add_time = (time.perf_counter() - start) / 1000
+
+        key_bytes = sys.getsizeof(index._keys) + sum(sys.getsizeof(key) + sys.getsizeof(key[0]) for key in index._keys)
+        print(f"{notes:>7} notes: {len(index):>7} terms, {len(index._keys):>8} keys, ~{key_bytes / 2**20:6.1f} MiB")
+        print(f"         build {build_time:6.2f} s, lookup {lookup_time * 1e6:7.1f} us, incremental add {add_time * 1e6:7.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""PDF text extraction throughput in pages/second.
+
+Uses the PDFs in a directory when one is given, otherwise a synthetic
+corpus of text-only PDFs.
+
+Run from the backend directory:
+    python -m benchmarks.bench_extraction [corpus_dir]
+"""
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from app.extraction import extract_pdf_text, compress_pages
+from benchmarks.corpus import make_text_pdf
+
+
+def load_corpus():
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+        return [open(os.path.join(directory, name), 'rb').read()
+                for name in sorted(os.listdir(directory)) if name.lower().endswith('.pdf')]
+    random.seed(0)
+    return [make_text_pdf(random.randint(5, 40)) for _ in range(48)]
+
+
+def main():
+    corpus = load_corpus()
+
+    start = time.perf_counter()
+    results = [extract_pdf_text(pdf) for pdf in corpus]
+    serial_time = time.perf_counter() - start
+
+    pages = sum(len(r) for r in results)
+    raw_bytes = sum(len('\f'.join(r).encode()) for r in results)
+    stored_bytes = sum(len(compress_pages(r)) for r in results)
+    print(f"{len(corpus)} files, {pages} pages, {sum(map(len, corpus)) / 2**20:.1f} MiB of PDF")
+    print(f"text: {raw_bytes / 2**20:.2f} MiB raw, {stored_bytes / 2**20:.2f} MiB stored "
+          f"({stored_bytes * 100 / raw_bytes:.0f}%)")
+    print(f"serial:       {pages / serial_time:8.1f} pages/s")
+
+    for workers in sorted({2, 4, os.cpu_count()}):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            # Warm the workers so process start-up is not counted
+            list(pool.map(extract_pdf_text, corpus[:workers]))
+            start = time.perf_counter()
+            list(pool.map(extract_pdf_text, corpus))
+            elapsed = time.perf_counter() - start
+        print(f"{workers:>2} processes: {pages / elapsed:8.1f} pages/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""PDF size and conversion time of photo uploads under each preprocessing setting.
+
+Uses the JPEG/PNG files in a directory when one is given, otherwise
+synthetic 12 MP "photos" of handwritten-looking text pages.
+
+Run from the backend directory:
+    python -m benchmarks.bench_images [photo_dir]
+"""
+import io
+import os
+import random
+import sys
+import time
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+from werkzeug.datastructures import FileStorage
+from app.converters import convert_images_to_pdf
+from benchmarks.corpus import random_words
+
+SETTINGS = [
+    ('as uploaded', dict(preprocess=False)),
+    ('color 200 dpi q85', dict(preprocess=True, target_dpi=200, color_mode='color', jpeg_quality=85)),
+    ('color 150 dpi q75', dict(preprocess=True, target_dpi=150, color_mode='color', jpeg_quality=75)),
+    ('grayscale 150 dpi q75', dict(preprocess=True, target_dpi=150, color_mode='grayscale', jpeg_quality=75)),
+    ('bilevel 200 dpi', dict(preprocess=True, target_dpi=200, color_mode='bilevel')),
+    ('bilevel 150 dpi', dict(preprocess=True, target_dpi=150, color_mode='bilevel')),
+]
+
+
+def make_photo(width=4032, height=3024):
+    # Off-white paper with uneven lighting, sensor noise and dark text lines
+    shade = np.linspace(225, 185, width)[None, :] + np.random.normal(0, 6, (height, width))
+    image = Image.fromarray(np.clip(shade, 0, 255).astype(np.uint8)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for y in range(150, height - 150, 90):
+        draw.text((200, y), random_words(12), fill=(40, 40, 70), font_size=60)
+    image = image.filter(ImageFilter.GaussianBlur(1))
+
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: taken with the phone held upright
+    image.save(buffer, 'JPEG', quality=92, exif=exif)
+    return buffer.getvalue()
+
+
+def load_photos():
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+        return [open(os.path.join(directory, name), 'rb').read()
+                for name in sorted(os.listdir(directory)) if name.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    random.seed(0)
+    np.random.seed(0)
+    return [make_photo() for _ in range(4)]
+
+
+def main():
+    photos = load_photos()
+    print(f"{len(photos)} photos, {sum(map(len, photos)) / 1e6:.1f} MB uploaded")
+
+    for label, options in SETTINGS:
+        files = [FileStorage(io.BytesIO(photo), filename=f"page{i}.jpg") for i, photo in enumerate(photos)]
+        start = time.perf_counter()
+        pdf = convert_images_to_pdf(files, **options)
+        elapsed = time.perf_counter() - start
+        size = len(pdf.getvalue())
+        print(f"{label:>22}: {size / 1e6:6.2f} MB PDF ({size / sum(map(len, photos)):6.1%}), "
+              f"{elapsed / len(photos) * 1000:6.0f} ms/page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Serialization and compression benchmark for large admin payloads.
+
+Builds synthetic payloads shaped like /admin/users, /admin/sections and
+/admin/logs, then compares the stock Flask JSON provider against
+FastJSONProvider and reports the bytes saved by response compression.
+
+Run from the backend directory:
+    python -m benchmarks.bench_json
+"""
+import gzip
+import random
+import string
+import timeit
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, DATETIME_FORMAT, orjson
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROWS = 5000
+REPEAT = 20
+
+
+def _word(n=8):
+    return ''.join(random.choices(string.ascii_lowercase, k=n))
+
+
+def build_payloads():
+    now = datetime.utcnow()
+    users = [{
+        'id': i,
+        'username': _word(),
+        'email': f"{_word()}@imsec.ac.in",
+        'role': random.choice(['student', 'moderator', 'professor']),
+        'section_id': random.randint(1, 60)
+    } for i in range(ROWS)]
+    sections = [{
+        'id': i,
+        'name': str(random.randint(1, 4)),
+        'year': random.randint(1, 4),
+        'department_id': random.randint(1, 12),
+        'academic_session_id': random.randint(1, 5),
+        'section_code': f"{random.randint(1, 4)}CSE{random.randint(1, 4)}",
+        'department_name': 'Computer Science and Engineering',
+        'session_name': '2025-2026'
+    } for i in range(ROWS)]
+    logs = [{
+        'id': i,
+        'timestamp': now - timedelta(minutes=i),
+        'username': _word(),
+        'action': random.choice(['user_login', 'note_upload', 'note_delete']),
+        'details': f"Note '{_word(20)}' uploaded by user ID {i}."
+    } for i in range(ROWS)]
+    return {'users': users, 'sections': sections, 'logs': logs}
+
+
+def stdlib_prepare(payload):
+    # What the routes did before: format every timestamp by hand
+    return [
+        {**row, 'timestamp': row['timestamp'].strftime(DATETIME_FORMAT)} if 'timestamp' in row else row
+        for row in payload
+    ]
+
+
+def main():
+    random.seed(0)
+    app = Flask(__name__)
+    stock = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    print(f"orjson available: {orjson is not None}, brotli available: {brotli is not None}")
+    print(f"{ROWS} rows per payload, best of {REPEAT} runs\n")
+
+    for name, payload in build_payloads().items():
+        stock_time = min(timeit.repeat(lambda: stock.dumps(stdlib_prepare(payload)), number=1, repeat=REPEAT))
+        fast_time = min(timeit.repeat(lambda: fast.dumps(payload), number=1, repeat=REPEAT))
+        body = fast.dumps(payload).encode()
+        gzipped = len(gzip.compress(body, compresslevel=6))
+
+        print(f"/admin/{name}")
+        print(f"  stock provider: {stock_time * 1000:8.2f} ms")
+        print(f"  fast provider:  {fast_time * 1000:8.2f} ms  ({stock_time / fast_time:.1f}x)")
+        print(f"  identity: {len(body):>9} bytes")
+        print(f"  gzip-6:   {gzipped:>9} bytes  ({100 - gzipped * 100 / len(body):.1f}% saved)")
+        if brotli is not None:
+            brotlied = len(brotli.compress(body, quality=8))
+            print(f"  br-8:     {brotlied:>9} bytes  ({100 - brotlied * 100 / len(body):.1f}% saved)")
+        print()
+
+
+if __name__ == '__main__':
+    main()
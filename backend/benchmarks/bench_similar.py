@@ -0,0 +1,44 @@
+"""Build, lookup and incremental-add cost of the TF-IDF related-notes index.
+
+Run from the backend directory:
+    python -m benchmarks.bench_similar
+"""
+import random
+import time
+import timeit
+from app.similar import SimilarityIndex
+from benchmarks.corpus import random_words
+
+QUERIES = 1000
+ADDS = 200
+
+
+def main():
+    random.seed(0)
+    # A Zipf-ish vocabulary so some terms are common and most are rare, as in real notes
+    vocabulary = random_words(20000).split()
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    for notes in (1000, 10000, 50000):
+        documents = [(i, ' '.join(random.choices(vocabulary, weights, k=random.randint(20, 200))))
+                     for i in range(notes)]
+
+        index = SimilarityIndex(k=10)
+        start = time.perf_counter()
+        index.rebuild(documents)
+        build_time = time.perf_counter() - start
+
+        ids = [random.randrange(notes) for _ in range(QUERIES)]
+        lookup_time = timeit.timeit(lambda: [index.similar(i, limit=5) for i in ids], number=1) / QUERIES
+
+        start = time.perf_counter()
+        for i in range(ADDS):
+            index.add(notes + i, documents[i][1])
+        add_time = (time.perf_counter() - start) / ADDS
+
+        print(f"{notes:>6} notes: build {build_time:7.2f} s, lookup {lookup_time * 1e6:6.1f} us, "
+              f"add {add_time * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Import-time and cold-start benchmark for the backend.
+
+Each measurement runs in a fresh interpreter, so nothing is cached in
+``sys.modules``:
+
+  import      ``import app.routes`` (every module a worker loads)
+  create_app  import plus ``create_app()``
+  first req   create_app plus the first GET /api/notes on a test client
+
+It also lists the slowest top-level imports from ``python -X importtime``
+and checks which heavy libraries are loaded after ``create_app()``; those
+should only appear once something uses them, or in a preloading master.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+HEAVY_MODULES = ['firebase_admin', 'google.cloud.storage', 'PIL', 'img2pdf', 'smtplib', 'pypdf', 'numpy', 'requests']
+
+SCRIPTS = {
+    'import': "import app.routes",
+    'create_app': "from app import create_app; create_app()",
+    'first req': (
+        "from app import create_app, db\n"
+        "app = create_app()\n"
+        "with app.app_context(): db.create_all()\n"
+        "assert app.test_client().get('/api/notes').status_code == 200\n"
+    ),
+}
+
+TIMED = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "{script}\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def environment(db_path):
+    env = dict(os.environ)
+    env.setdefault('JWT_SECRET_KEY', 'x' * 40)
+    env['DATABASE_URL'] = f'sqlite:///{db_path}'
+    # No credentials on purpose: startup must not need them
+    env.pop('FIREBASE_CREDENTIALS_JSON', None)
+    return env
+
+
+def run(code, env, *flags):
+    return subprocess.run([sys.executable, *flags, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+
+def time_script(script, env):
+    return float(run(TIMED.format(script=script), env).stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top=12):
+    stderr = run("import app.routes", env, '-X', 'importtime').stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Top-level imports of app and of its own modules only
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1 or (depth == 2 and name.strip().startswith('app.')):
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = environment(os.path.join(tmp, 'bench.db'))
+
+        print(f"{'stage':<12}{'median ms':>12}{'min ms':>10}")
+        for stage, script in SCRIPTS.items():
+            times = [time_script(script, env) * 1000 for _ in range(RUNS)]
+            print(f"{stage:<12}{statistics.median(times):>12.0f}{min(times):>10.0f}")
+
+        print("\nslowest imports (cumulative ms)")
+        for ms, name in slowest_imports(env):
+            print(f"  {ms:8.1f}  {name}")
+
+        loaded = run(
+            "import sys\nfrom app import create_app\ncreate_app()\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+            env
+        ).stdout.strip()
+        print(f"\nheavy modules loaded by create_app(): {loaded or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Top-k trending latency as the notes table grows.
+
+Compares ordering by the incrementally maintained ``trending_score``
+(an index range scan) with scoring every note per request from its
+counters. Uses an in-memory SQLite database with the same indexes as
+the notes table.
+
+Run from the backend directory:
+    python -m benchmarks.bench_trending
+"""
+import math
+import random
+import sqlite3
+import timeit
+
+DEPARTMENTS = 20
+SUBJECTS = 200
+QUERIES = 200
+
+
+def build(notes):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, department_id INTEGER, subject TEXT, "
+                 "created_at REAL, views INTEGER, downloads INTEGER, trending_score REAL)")
+    rows = []
+    for i in range(notes):
+        views, downloads = random.randint(0, 500), random.randint(0, 100)
+        age_days = random.uniform(0, 365)
+        score = (views + 3 * downloads) * 2.0 ** (-age_days / 3)
+        rows.append((i, random.randrange(DEPARTMENTS), f"subject {random.randrange(SUBJECTS)}", -age_days,
+                     views, downloads, score))
+    conn.executemany("INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("CREATE INDEX ix_notes_department_id_trending_score ON notes (department_id, trending_score)")
+    conn.execute("CREATE INDEX ix_notes_subject_trending_score ON notes (subject, trending_score)")
+    return conn
+
+
+def main():
+    random.seed(0)
+    for notes in (10000, 100000, 1000000):
+        conn = build(notes)
+        conn.create_function('exp', 1, math.exp)
+
+        def indexed():
+            department = random.randrange(DEPARTMENTS)
+            conn.execute("SELECT id FROM notes WHERE department_id = ? ORDER BY trending_score DESC LIMIT 20",
+                         (department,)).fetchall()
+
+        def by_subject():
+            subject = f"subject {random.randrange(SUBJECTS)}"
+            conn.execute("SELECT id FROM notes WHERE subject = ? ORDER BY trending_score DESC LIMIT 20",
+                         (subject,)).fetchall()
+
+        def per_request():
+            # What a per-request computation would have to do: score every note of the department
+            department = random.randrange(DEPARTMENTS)
+            conn.execute("SELECT id FROM notes WHERE department_id = ? "
+                         "ORDER BY (views + 3 * downloads) * exp(created_at * 0.231) DESC LIMIT 20",
+                         (department,)).fetchall()
+
+        results = [timeit.timeit(fn, number=QUERIES) / QUERIES * 1000 for fn in (indexed, by_subject, per_request)]
+        print(f"{notes:>8} notes: department top-20 {results[0]:6.3f} ms, subject top-20 {results[1]:6.3f} ms, "
+              f"scored per request {results[2]:8.2f} ms")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
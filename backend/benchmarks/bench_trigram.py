@@ -0,0 +1,51 @@
+"""Fuzzy search latency of the trigram index as the notes table grows.
+
+Run from the backend directory:
+    python -m benchmarks.bench_trigram
+"""
+import random
+import string
+import time
+import timeit
+from app.trigram import TrigramIndex
+
+QUERIES = 200
+
+
+def _word():
+    return ''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 12)))
+
+
+def _typo(text):
+    # Swap two adjacent letters, like "Thermodynamcis"
+    i = random.randrange(len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def main():
+    random.seed(0)
+    vocabulary = [_word() for _ in range(5000)]
+
+    for notes in (10000, 100000, 500000):
+        titles = [' '.join(random.choices(vocabulary, k=random.randint(2, 5))) for _ in range(notes)]
+
+        index = TrigramIndex()
+        start = time.perf_counter()
+        index.rebuild(enumerate(titles))
+        build_time = time.perf_counter() - start
+
+        queries = [_typo(random.choice(titles)) for _ in range(QUERIES)]
+        hits = sum(1 for q in queries if index.search(q, limit=20))
+        search_time = timeit.timeit(lambda: [index.search(q, limit=20) for q in queries], number=1) / QUERIES
+
+        start = time.perf_counter()
+        for i in range(1000):
+            index.add(notes + i, titles[i])
+        add_time = (time.perf_counter() - start) / 1000
+
+        print(f"{notes:>7} notes: build {build_time:6.2f} s, search {search_time * 1000:6.2f} ms, "
+              f"add {add_time * 1e6:6.1f} us, {hits}/{QUERIES} typo queries matched")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+# gunicorn -c gunicorn.conf.py wsgi:app  (from backend/)
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+# Load wsgi.py (and the heavy modules it preloads) once in the master; workers share it copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared across processes
+    from app import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,7 @@
+from app import create_app
+from app.preload import preload_modules
+
+app = create_app()
+
+# Under gunicorn --preload this runs once in the master and the workers inherit the imported modules
+preload_modules()
@@ -14,6 +14,11 @@ api.interceptors.request.use(
     if (token) {
       config.headers['Authorization'] = `Bearer ${token}`;
     }
+    // Set after our own writes so the backend reads from the primary database until then
+    const readPrimaryUntil = localStorage.getItem('readPrimaryUntil');
+    if (readPrimaryUntil) {
+      config.headers['X-Read-Primary-Until'] = readPrimaryUntil;
+    }
     return config;
   },
   (error) => {
@@ -24,7 +29,11 @@ api.interceptors.request.use(
 // Axios Response Interceptor: This runs AFTER a response is received.
 api.interceptors.response.use(
   (response) => {
-    // If the request was successful, just return the response
+    // If the request was successful, remember how long a write keeps our reads on the primary
+    const readPrimaryUntil = response.headers['x-read-primary-until'];
+    if (readPrimaryUntil) {
+      localStorage.setItem('readPrimaryUntil', readPrimaryUntil);
+    }
     return response;
   },
   async (error) => {
@@ -109,9 +109,10 @@ function NoteDetails() {
                     {note.sections && note.sections.length > 0 && (
                         <Text><strong>Sections:</strong> {note.sections.map(s => s.code).join(', ')}</Text>
                     )}
+                    <Text size="sm" c="dimmed" mt="xs">{note.views} views · {note.downloads} downloads</Text>
                     
                     <Group mt="xl">
-                        <Button component="a" href={note.file_url} target="_blank" rel="noopener noreferrer">
+                        <Button component="a" href={`${api.defaults.baseURL}/notes/${note.id}/file`} target="_blank" rel="noopener noreferrer">
                             Download
                         </Button>
 
@@ -2,7 +2,7 @@ import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { Link as RouterLink } from 'react-router-dom';
 import api from '../api';
 import { toast } from 'react-toastify';
-import { Card, Grid, TextInput, Switch, Button, Text, Badge, Group, Paper, Loader, Center, Pagination, Modal, NumberInput, Select, MultiSelect } from '@mantine/core';
+import { Card, Grid, Image, TextInput, Switch, Button, Text, Badge, Group, Paper, Loader, Center, Pagination, Modal, NumberInput, Select, MultiSelect } from '@mantine/core';
 import { useDisclosure } from '@mantine/hooks';
 
 function NoteList() {
@@ -178,17 +178,23 @@ function NoteList() {
                                     <Grid.Col key={note.id} span={{ base: 12, md: 6, lg: 4 }}>
                                         <Card shadow="sm" padding="lg" radius="md" withBorder>
                                             <Card.Section component={RouterLink} to={`/notes/${note.id}`} style={{ textDecoration: 'none', color: 'inherit' }}>
+                                                {note.preview_url && (
+                                                    <Image src={note.preview_url} h={160} fit="cover" alt={`First page of ${note.title}`} loading="lazy" />
+                                                )}
                                                 <Group justify="space-between" mt="md" px="md">
                                                     <Text fw={500}>{note.title}</Text>
                                                     {note.is_verified && <Badge color="green" variant="light">Verified</Badge>}
                                                 </Group>
-                                                <Text size="sm" c="dimmed" px="md" pb="xs">Subject: {note.subject}</Text>
+                                                <Text size="sm" c="dimmed" px="md" pb="xs">
+                                                    Subject: {note.subject}
+                                                    {note.page_count ? ` · ${note.page_count} page${note.page_count === 1 ? '' : 's'}` : ''}
+                                                </Text>
                                             </Card.Section>
 
                                             <Group mt="md" grow>
                                                 <Button
                                                     component="a"
-                                                    href={note.file_url}
+                                                    href={`${api.defaults.baseURL}/notes/${note.id}/file`}
                                                     target="_blank"
                                                     rel="noopener noreferrer"
                                                     variant="light"